@@ -0,0 +1,48 @@
+"""Add columnar table storage
+
+Revision ID: 4b8f0a2d93e6
+Revises: 9d2e6b71c4a8
+Create Date: 2026-10-19 17:05:33.918240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.utils.columnar import ColumnarTable, GROUP_ROWS
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8f0a2d93e6'
+down_revision: Union[str, None] = '9d2e6b71c4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('object_tables', sa.Column('encoded_data', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    # Rows of tables stored columnar are only in this column; write them back as rows first
+    connection = op.get_bind()
+    object_table_rows = sa.table('object_table_rows',
+        sa.column('table_id', postgresql.UUID(as_uuid=True)),
+        sa.column('row_index', sa.Integer()),
+        sa.column('cells', postgresql.JSONB())
+    )
+    table_ids = connection.execute(sa.text("SELECT id FROM object_tables WHERE encoded_data IS NOT NULL")).scalars().all()
+    for table_id in table_ids:
+        encoded_data = connection.execute(
+            sa.text("SELECT encoded_data FROM object_tables WHERE id = :id"), {"id": table_id}
+        ).scalar()
+        table = ColumnarTable(bytes(encoded_data))
+        # A row group at a time, so a large table is never decoded whole
+        for offset in range(0, table.row_count, GROUP_ROWS):
+            connection.execute(sa.insert(object_table_rows), [
+                {"table_id": table_id, "row_index": offset + index, "cells": row}
+                for index, row in enumerate(table.read(offset, GROUP_ROWS))
+            ])
+    op.drop_column('object_tables', 'encoded_data')
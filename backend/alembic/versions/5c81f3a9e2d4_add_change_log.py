@@ -0,0 +1,41 @@
+"""Add change log for the delta sync feed
+
+Revision ID: 5c81f3a9e2d4
+Revises: b62d0e5f7a19
+Create Date: 2026-10-19 18:36:44.218907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5c81f3a9e2d4'
+down_revision: Union[str, None] = 'b62d0e5f7a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('change_log',
+        sa.Column('seq', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column('changed_date', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('seq'),
+        sa.UniqueConstraint('entity', 'entity_id')
+    )
+    op.create_index('ix_change_log_txid_seq', 'change_log', ['txid', 'seq'])
+
+    # Existing rows count as changed now, so a feed read from the start is a full snapshot
+    for entity in ('objects', 'relations', 'hierarchies'):
+        op.execute(f"INSERT INTO change_log (entity, entity_id, txid) SELECT '{entity}', id, txid_current() FROM {entity}")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_change_log_txid_seq', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,32 @@
+"""Add per-object lookup indexes
+
+Revision ID: 7e19b4c6a2f3
+Revises: d3a7c95e1f08
+Create Date: 2026-10-19 19:40:18.302556
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e19b4c6a2f3'
+down_revision: Union[str, None] = 'd3a7c95e1f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # objects.type and objects.modified_date are indexed by b62d0e5f7a19,
+    # relation_secondary_objects.object_id by d3a7c95e1f08
+    op.create_index('ix_relations_primary_object_id', 'relations', ['primary_object_id'])
+    op.create_index('ix_hierarchies_parent_object_id', 'hierarchies', ['parent_object_id'])
+    op.create_index('ix_hierarchy_type_object_type', 'hierarchy_type', ['object_type'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hierarchy_type_object_type', table_name='hierarchy_type')
+    op.drop_index('ix_hierarchies_parent_object_id', table_name='hierarchies')
+    op.drop_index('ix_relations_primary_object_id', table_name='relations')
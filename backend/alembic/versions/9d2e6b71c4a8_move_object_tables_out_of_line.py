@@ -0,0 +1,81 @@
+"""Move object tables out of line
+
+Revision ID: 9d2e6b71c4a8
+Revises: e41b8a6c2f57
+Create Date: 2026-10-19 16:21:07.493812
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e6b71c4a8'
+down_revision: Union[str, None] = 'e41b8a6c2f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('object_tables',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('object_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('objects.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('columns', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=True),
+        sa.Column('row_count', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('object_id', 'name')
+    )
+    op.create_table('object_table_rows',
+        sa.Column('table_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('object_tables.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('row_index', sa.Integer(), nullable=False),
+        sa.Column('cells', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint('table_id', 'row_index')
+    )
+
+    # Definitions keep their order; a repeated name within an object keeps its first table
+    op.execute("""
+        INSERT INTO object_tables (id, object_id, name, position, columns, row_count)
+        SELECT DISTINCT ON (o.id, coalesce(t.value->>'name', 'Table ' || t.ordinality))
+            gen_random_uuid(),
+            o.id,
+            coalesce(t.value->>'name', 'Table ' || t.ordinality),
+            t.ordinality - 1,
+            coalesce(t.value->'columns', '[]'::jsonb),
+            CASE WHEN jsonb_typeof(t.value->'data') = 'array' THEN jsonb_array_length(t.value->'data') ELSE 0 END
+        FROM objects o
+        CROSS JOIN LATERAL jsonb_array_elements(o.tables::jsonb) WITH ORDINALITY t(value, ordinality)
+        WHERE jsonb_typeof(o.tables::jsonb) = 'array'
+        ORDER BY o.id, coalesce(t.value->>'name', 'Table ' || t.ordinality), t.ordinality
+    """)
+    op.execute("""
+        INSERT INTO object_table_rows (table_id, row_index, cells)
+        SELECT ot.id, r.ordinality - 1, r.value
+        FROM objects o
+        CROSS JOIN LATERAL jsonb_array_elements(o.tables::jsonb) WITH ORDINALITY t(value, ordinality)
+        JOIN object_tables ot ON ot.object_id = o.id AND ot.position = t.ordinality - 1
+        CROSS JOIN LATERAL jsonb_array_elements(t.value->'data') WITH ORDINALITY r(value, ordinality)
+        WHERE jsonb_typeof(o.tables::jsonb) = 'array' AND jsonb_typeof(t.value->'data') = 'array'
+    """)
+    op.drop_column('objects', 'tables')
+
+
+def downgrade() -> None:
+    op.add_column('objects', sa.Column('tables', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=True))
+    op.execute("""
+        UPDATE objects o SET tables = coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'name', ot.name,
+                'columns', ot.columns,
+                'data', coalesce((
+                    SELECT jsonb_agg(r.cells ORDER BY r.row_index) FROM object_table_rows r WHERE r.table_id = ot.id
+                ), '[]'::jsonb)
+            ) ORDER BY ot.position)
+            FROM object_tables ot WHERE ot.object_id = o.id
+        ), '[]'::jsonb)
+    """)
+    op.drop_table('object_table_rows')
+    op.drop_table('object_tables')
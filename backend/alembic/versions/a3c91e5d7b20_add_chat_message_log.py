@@ -0,0 +1,79 @@
+"""Add chat message log
+
+Revision ID: a3c91e5d7b20
+Revises: 0f4bb0ca3d54
+Create Date: 2026-10-19 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e5d7b20'
+down_revision: Union[str, None] = '0f4bb0ca3d54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rolling summary replaces the replayed JSON message array
+    op.add_column('chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summarized_seq', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('chat_sessions', sa.Column('message_count', sa.Integer(), server_default='0', nullable=True))
+
+    # Append-only message log
+    op.create_table('chat_messages',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('session_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('chat_sessions.id'), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'seq')
+    )
+    op.create_index('ix_chat_messages_session_id', 'chat_messages', ['session_id'])
+
+    # Existing conversations move into the log; seq is the 1-based position in the old array
+    op.execute("""
+        INSERT INTO chat_messages (id, session_id, seq, role, content, timestamp)
+        SELECT
+            gen_random_uuid(),
+            s.id,
+            m.ordinality,
+            coalesce(m.value->>'role', 'user'),
+            coalesce(m.value->>'content', ''),
+            coalesce((m.value->>'timestamp')::timestamp, s.created_date)
+        FROM chat_sessions s
+        CROSS JOIN LATERAL jsonb_array_elements(s.messages::jsonb) WITH ORDINALITY m(value, ordinality)
+        WHERE jsonb_typeof(s.messages::jsonb) = 'array'
+    """)
+    op.execute("""
+        UPDATE chat_sessions s SET message_count = coalesce((
+            SELECT max(m.seq) FROM chat_messages m WHERE m.session_id = s.id
+        ), 0)
+    """)
+    op.drop_column('chat_sessions', 'messages')
+
+
+def downgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('messages', postgresql.JSONB(), server_default='[]', nullable=True))
+    op.execute("""
+        UPDATE chat_sessions s SET messages = coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', m.id::text,
+                'role', m.role,
+                'content', m.content,
+                'timestamp', m.timestamp
+            ) ORDER BY m.seq)
+            FROM chat_messages m WHERE m.session_id = s.id
+        ), '[]'::jsonb)
+    """)
+    op.drop_index('ix_chat_messages_session_id', table_name='chat_messages')
+    op.drop_table('chat_messages')
+    op.drop_column('chat_sessions', 'message_count')
+    op.drop_column('chat_sessions', 'summarized_seq')
+    op.drop_column('chat_sessions', 'summary')
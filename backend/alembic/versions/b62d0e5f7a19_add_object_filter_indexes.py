@@ -0,0 +1,37 @@
+"""Add object filter indexes
+
+Revision ID: b62d0e5f7a19
+Revises: 4b8f0a2d93e6
+Create Date: 2026-10-19 17:48:12.660354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b62d0e5f7a19'
+down_revision: Union[str, None] = '4b8f0a2d93e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 001 already creates JSONB; this covers databases built from the JSON model
+    op.alter_column('objects', 'attributes',
+                    type_=postgresql.JSONB(astext_type=sa.Text()),
+                    postgresql_using='attributes::jsonb')
+    op.create_index('ix_objects_attributes', 'objects', ['attributes'], postgresql_using='gin')
+    op.create_index('ix_objects_type', 'objects', ['type'])
+    op.create_index('ix_objects_modified_date', 'objects', ['modified_date'])
+    # Serves name prefix filters (LIKE 'prefix%') whatever the database collation
+    op.create_index('ix_objects_name_prefix', 'objects', [sa.text('name text_pattern_ops')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_objects_name_prefix', table_name='objects')
+    op.drop_index('ix_objects_modified_date', table_name='objects')
+    op.drop_index('ix_objects_type', table_name='objects')
+    op.drop_index('ix_objects_attributes', table_name='objects')
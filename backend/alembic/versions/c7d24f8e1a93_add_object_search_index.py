@@ -0,0 +1,30 @@
+"""Add object full-text search index
+
+Revision ID: c7d24f8e1a93
+Revises: a3c91e5d7b20
+Create Date: 2026-10-19 11:40:05.532871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d24f8e1a93'
+down_revision: Union[str, None] = 'a3c91e5d7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Expression must match DatabaseService.rank_objects_fulltext
+    op.execute(
+        "CREATE INDEX ix_objects_search_document ON objects USING gin "
+        "(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '')))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_objects_search_document', table_name='objects')
@@ -0,0 +1,30 @@
+"""Add where-used indexes
+
+Revision ID: d3a7c95e1f08
+Revises: 5c81f3a9e2d4
+Create Date: 2026-10-19 19:12:30.845167
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7c95e1f08'
+down_revision: Union[str, None] = '5c81f3a9e2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_relation_secondary_objects_object_id', 'relation_secondary_objects', ['object_id'])
+    # Must match the CAST(child_object_ids AS JSONB) the queries use
+    op.create_index('ix_hierarchies_child_object_ids', 'hierarchies',
+                    [sa.text('CAST(child_object_ids AS JSONB)')], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hierarchies_child_object_ids', table_name='hierarchies')
+    op.drop_index('ix_relation_secondary_objects_object_id', table_name='relation_secondary_objects')
@@ -0,0 +1,30 @@
+"""Add catalog write counters
+
+Revision ID: e41b8a6c2f57
+Revises: c7d24f8e1a93
+Create Date: 2026-10-19 14:02:51.274410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b8a6c2f57'
+down_revision: Union[str, None] = 'c7d24f8e1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('catalog_counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_counters')
@@ -1,24 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+import datetime
+import os
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import asyncio
+import json
 import uuid
-from datetime import datetime
 
-from app.db.base import get_db
-from app.services.database import DatabaseService
+from app.db.base import get_db, SessionLocal
+from app.services.database import DatabaseService, OBJECT_EXPANSIONS
 from app.services.ai_service import AIService
-from app.services.report_service import ReportService
+from app.services.llm_provider import create_llm_provider
+from app.services.report_service import ReportService, REPORT_TYPES, report_version
+from app.services.report_jobs import ReportJobManager, ReportJob
+from app.services.report_cache import ReportCache
+from app.services.export_service import ExportService, EXPORT_TABLES, EXPORT_FORMATS, pa
+from app.services.import_service import ImportService
+from app.services.integrity_sweeper import IntegritySweeper
+from app.services.batch_service import run_batch, BatchOperationError
+from app.services.change_events import change_bus, RESYNC
+from app.services.object_filter import parse_object_filter, has_relative_time, ObjectFilterError
 from app.schemas.schemas import (
     ObjectType, ObjectCreate, ObjectUpdate,
     Relation, RelationCreate, RelationUpdate,
     Hierarchy, HierarchyCreate, HierarchyUpdate,
     SearchRequest, SearchResponse,
-    ChatRequest, ChatResponse, TypesCreate, TypesUpdate, TypesBase,
+    ChatRequest, ChatResponse, ChatSession, TypesCreate, TypesUpdate, TypesBase,
     RelationTypeCreate, RelationTypeBase, RelationTypeUpdate,
     HierarchyTypeBase, HierarchyTypeCreate, HierarchyTypeUpdate,
+    ReportJobCreate, ReportJobStatus, ImportResult, TableRowsPage, ObjectFacets, ChangeFeed, DeletedIds,
+    ObjectUsage, ExpandedObject, ExpandedRelation, BatchRequest, BatchResponse,
 )
 from app.core.config import settings
 from app.api.auth import router as auth_router
+from app.utils.metrics import search_stats
+from app.utils.responses import SendfileResponse
+from app.utils.cache import LRUCache
 
 router = APIRouter()
 
@@ -26,8 +45,25 @@ router = APIRouter()
 router.include_router(auth_router, prefix="/auth", tags=["auth"])
 
 # Initialize services
-ai_service = AIService(settings.openai_api_key) if settings.openai_api_key else None
-report_service = ReportService()
+llm_provider = create_llm_provider()
+ai_service = AIService(llm_provider, SessionLocal) if llm_provider else None
+report_cache = ReportCache(settings.report_storage_dir)
+report_service = ReportService(report_cache)
+report_jobs = ReportJobManager(
+    report_service,
+    report_cache,
+    settings.report_workers,
+    settings.report_ttl_seconds
+)
+export_service = ExportService(SessionLocal)
+import_service = ImportService(SessionLocal)
+facet_cache = LRUCache(settings.facet_cache_entries)
+integrity_sweeper = IntegritySweeper(
+    SessionLocal,
+    settings.integrity_sweep_batch_size,
+    settings.integrity_sweep_pause_ms / 1000,
+    settings.integrity_sweep_interval_seconds
+)
 
 # Dependency to get database service
 def get_database_service(db: Session = Depends(get_db)) -> DatabaseService:
@@ -94,23 +130,95 @@ async def delete_object_type(type_id: int, db_service: DatabaseService = Depends
         raise HTTPException(status_code=404, detail="Object type not found")
     
 # Objects endpoints
-@router.get("/objects", response_model=List[ObjectType])
-async def get_objects(db_service: DatabaseService = Depends(get_database_service)):
-    """Get all objects"""
-    return db_service.get_objects()
-
-@router.get("/objects/{object_id}", response_model=ObjectType)
-async def get_object(object_id: str, db_service: DatabaseService = Depends(get_database_service)):
-    """Get a specific object by ID"""
+def parse_expand(expand: Optional[str]) -> List[str]:
+    """Comma-separated OBJECT_EXPANSIONS from the expand query parameter"""
+    names = [name for name in (expand or "").split(",") if name]
+    unknown = [name for name in names if name not in OBJECT_EXPANSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown expansion: {', '.join(unknown)} (expected {', '.join(OBJECT_EXPANSIONS)})"
+        )
+    return names
+
+def expanded_objects(objects: List, expand: List[str], db_service: DatabaseService) -> List[ExpandedObject]:
+    """Objects with the requested associations embedded; fields not asked for are left out of the response"""
+    results = []
+    for obj, expansion in zip(objects, db_service.expand_objects(objects, expand)):
+        fields = {}
+        if "relations" in expansion:
+            fields["relations"] = [
+                ExpandedRelation(
+                    **Relation.model_validate(relation).model_dump(),
+                    **({"secondary_objects": relation.secondary_objects} if "secondaries" in expand else {})
+                )
+                for relation in expansion["relations"]
+            ]
+        if "hierarchy" in expansion:
+            fields["hierarchy"] = expansion["hierarchy"]
+        if "object_type" in expansion:
+            object_type, hierarchy_type = expansion["object_type"], expansion["hierarchy_type"]
+            fields["object_type"] = TypesBase.model_validate(object_type, from_attributes=True) if object_type else None
+            fields["hierarchy_type"] = HierarchyTypeBase.model_validate(hierarchy_type, from_attributes=True) if hierarchy_type else None
+        results.append(ExpandedObject(**ObjectType.model_validate(obj).model_dump(), **fields))
+    return results
+
+@router.get("/objects", response_model=List[ExpandedObject], response_model_exclude_unset=True)
+async def get_objects(
+    filter_expression: Optional[str] = Query(None, alias="filter"),
+    expand: Optional[str] = None,
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """Get all objects, or those matching a filter such as 'type=Document attributes.status=Draft modified>=-7d';
+    expand=relations,secondaries,hierarchy,type embeds those associations"""
+    try:
+        conditions = parse_object_filter(filter_expression)
+    except ObjectFilterError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filter: {str(e)}")
+    expansions = parse_expand(expand)
+    objects = db_service.get_objects(conditions)
+    return expanded_objects(objects, expansions, db_service) if expansions else objects
+
+@router.get("/objects/facets", response_model=ObjectFacets)
+async def get_object_facets(
+    filter_expression: Optional[str] = Query(None, alias="filter"),
+    attributes: Optional[str] = None,
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """Object counts per type, object type and attribute value (comma-separated keys) under a filter"""
+    try:
+        conditions = parse_object_filter(filter_expression)
+    except ObjectFilterError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filter: {str(e)}")
+    attribute_keys = sorted({key for key in (attributes or "").split(",") if key})
+    
+    # Cached per catalog version; filters relative to now also expire every minute
+    versions = db_service.get_catalog_versions()
+    cache_key = (
+        tuple(sorted(versions.items())),
+        filter_expression or "",
+        tuple(attribute_keys),
+        datetime.datetime.utcnow().strftime("%Y%m%d%H%M") if has_relative_time(filter_expression) else None
+    )
+    facets = facet_cache.get(cache_key)
+    if facets is None:
+        facets = db_service.get_object_facets(conditions, attribute_keys, settings.facet_value_limit)
+        facet_cache.put(cache_key, facets)
+    return facets
+
+@router.get("/objects/{object_id}", response_model=ExpandedObject, response_model_exclude_unset=True)
+async def get_object(object_id: str, expand: Optional[str] = None, db_service: DatabaseService = Depends(get_database_service)):
+    """Get a specific object by ID, with the associations named in expand embedded"""
     try:
         uuid_obj = uuid.UUID(object_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid object ID format")
+    expansions = parse_expand(expand)
     
     obj = db_service.get_object(uuid_obj)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
-    return obj
+    return expanded_objects([obj], expansions, db_service)[0] if expansions else obj
 
 @router.post("/objects", response_model=ObjectType, status_code=201)
 async def create_object(object_data: ObjectCreate, db_service: DatabaseService = Depends(get_database_service)):
@@ -145,6 +253,39 @@ async def delete_object(object_id: str, db_service: DatabaseService = Depends(ge
     if not db_service.delete_object(uuid_obj):
         raise HTTPException(status_code=404, detail="Object not found")
 
+@router.get("/objects/{object_id}/tables/{table_name}/rows", response_model=TableRowsPage)
+async def get_object_table_rows(
+    object_id: str,
+    table_name: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    columns: Optional[str] = None,
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """Get a range of rows from one of an object's tables, optionally only some columns (comma-separated)"""
+    try:
+        uuid_obj = uuid.UUID(object_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid object ID format")
+    
+    table = db_service.get_object_table(uuid_obj, table_name)
+    if not table:
+        raise HTTPException(status_code=404, detail="Table not found")
+    
+    selected = columns.split(",") if columns else None
+    try:
+        rows = db_service.get_object_table_rows(table, offset, limit, selected)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Unknown column")
+    return TableRowsPage(
+        name=table.name,
+        columns=selected or table.columns or [],
+        row_count=table.row_count,
+        offset=offset,
+        limit=limit,
+        rows=rows
+    )
+
 # Relation Types endpoints
 @router.get("/relation-types", response_model=List[RelationTypeBase])
 async def get_relation_types(db_service: DatabaseService = Depends(get_database_service)):
@@ -200,6 +341,21 @@ async def get_object_relations(object_id: str, db_service: DatabaseService = Dep
     
     return db_service.get_object_relations(uuid_obj)
 
+@router.get("/objects/{object_id}/used-by", response_model=ObjectUsage)
+async def get_object_usage(
+    object_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """Get relations using an object as a secondary and hierarchies containing it as a child"""
+    try:
+        uuid_obj = uuid.UUID(object_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid object ID format")
+    
+    return ObjectUsage(offset=offset, limit=limit, **db_service.get_object_usage(uuid_obj, offset, limit))
+
 @router.post("/relations", response_model=Relation, status_code=201)
 async def create_relation(relation_data: RelationCreate, db_service: DatabaseService = Depends(get_database_service)):
     """Create a new relation"""
@@ -289,6 +445,90 @@ async def create_hierarchy(hierarchy_data: HierarchyCreate, db_service: Database
     """Create a new hierarchy"""
     return db_service.create_hierarchy(hierarchy_data)
 
+# Batch writes
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch_operations(batch: BatchRequest, db_service: DatabaseService = Depends(get_database_service)):
+    """Apply ordered create/update/delete operations in one transaction; a failure rolls back the whole batch"""
+    if len(batch.operations) > settings.batch_max_operations:
+        raise HTTPException(status_code=400, detail=f"At most {settings.batch_max_operations} operations per batch")
+    try:
+        results = run_batch(db_service, batch.operations)
+    except BatchOperationError as e:
+        raise HTTPException(status_code=e.status_code, detail={"index": e.index, "error": e.detail})
+    return BatchResponse(results=results)
+
+# Delta sync feed
+@router.get("/changes", response_model=ChangeFeed)
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """Objects, relations and hierarchies written since a cursor, with deleted ids; no cursor starts from the beginning"""
+    try:
+        after = tuple(int(part) for part in since.split(".")) if since else (0, 0)
+        if len(after) != 2:
+            raise ValueError()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    changes, position, has_more = db_service.get_changes(after, limit)
+    changed = {"objects": [], "relations": [], "hierarchies": []}
+    deleted = {"objects": [], "relations": [], "hierarchies": []}
+    for change in changes:
+        (deleted if change.deleted else changed)[change.entity].append(change.entity_id)
+    
+    return ChangeFeed(
+        cursor=f"{position[0]}.{position[1]}",
+        has_more=has_more,
+        objects=db_service.get_objects_by_ids(changed["objects"]),
+        relations=db_service.get_relations_by_ids(changed["relations"]),
+        hierarchies=db_service.get_hierarchies_by_ids(changed["hierarchies"]),
+        deleted=DeletedIds(**deleted)
+    )
+
+# Change events
+@router.get("/events")
+async def stream_events():
+    """Server-sent change events: batches of {entity, id, revision, deleted}, or resync"""
+    subscription = change_bus.subscribe()
+    
+    async def events():
+        try:
+            async for batch in change_bus.stream(subscription):
+                if batch is None:
+                    yield ": keepalive\n\n"
+                elif batch == RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                else:
+                    yield f"event: changes\ndata: {json.dumps(batch)}\n\n"
+        finally:
+            change_bus.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/events")
+async def websocket_events(websocket: WebSocket):
+    """The same change events over a WebSocket, one JSON message per batch"""
+    await websocket.accept()
+    subscription = change_bus.subscribe()
+    try:
+        async for batch in change_bus.stream(subscription):
+            if batch is None:
+                await websocket.send_json({"type": "keepalive"})
+            elif batch == RESYNC:
+                await websocket.send_json({"type": "resync"})
+            else:
+                await websocket.send_json({"type": "changes", "changes": batch})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_bus.unsubscribe(subscription)
+
 # AI Search endpoint
 @router.post("/search", response_model=SearchResponse)
 async def search_objects(
@@ -299,11 +539,17 @@ async def search_objects(
     if not ai_service:
         raise HTTPException(status_code=503, detail="AI service not available")
     
+    deadline_ms = search_request.deadlineMs or settings.search_deadline_ms
     try:
-        return await ai_service.search_objects(search_request.query, db_service)
+        return await ai_service.search_with_deadline(search_request.query, db_service, deadline_ms)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@router.get("/search/stats")
+async def get_search_stats():
+    """Search latency percentiles and how often the local fallback fired"""
+    return search_stats.snapshot()
+
 # Chat endpoint
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_ai(
@@ -323,44 +569,134 @@ async def chat_with_ai(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
 
+@router.get("/chat/sessions/{session_id}", response_model=ChatSession)
+async def get_chat_session(session_id: str, db_service: DatabaseService = Depends(get_database_service)):
+    """Get a chat session with its full message log"""
+    try:
+        uuid_obj = uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid session ID format")
+    
+    session = db_service.get_chat_session(uuid_obj)
+    if not session:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return session
+
 # Reports endpoints
+def _report_job_status(job: ReportJob) -> ReportJobStatus:
+    return ReportJobStatus(
+        id=job.id,
+        report_type=job.report_type,
+        status=job.status,
+        progress=job.progress,
+        error=job.error,
+        created_date=job.created_date,
+        completed_date=job.completed_date,
+        download_url=f"/api/reports/jobs/{job.id}/download" if job.status == "completed" else None
+    )
+
+def _get_report_job(job_id: str) -> ReportJob:
+    try:
+        uuid_obj = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+    
+    job = report_jobs.get(uuid_obj)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+def _report_file_response(job: ReportJob, request: Request):
+    etag = f'"{job.version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if not job.path or not os.path.exists(job.path):
+        raise HTTPException(status_code=410, detail="Report file has expired")
+    
+    return SendfileResponse(job.path, media_type="application/pdf", filename=job.filename, headers={"ETag": etag})
+
+@router.post("/reports", response_model=ReportJobStatus, status_code=202)
+async def create_report_job(job_request: ReportJobCreate, db_service: DatabaseService = Depends(get_database_service)):
+    """Queue a PDF report for background rendering"""
+    if job_request.report_type not in REPORT_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid report type")
+    
+    job = report_jobs.submit(job_request.report_type, db_service.get_catalog_versions())
+    return _report_job_status(job)
+
+@router.get("/reports/jobs/{job_id}", response_model=ReportJobStatus)
+async def get_report_job(job_id: str):
+    """Get the status and progress of a report job"""
+    return _report_job_status(_get_report_job(job_id))
+
+@router.get("/reports/jobs/{job_id}/download")
+async def download_report_job(job_id: str, request: Request):
+    """Download the PDF of a completed report job"""
+    job = _get_report_job(job_id)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Report job is {job.status}")
+    
+    return _report_file_response(job, request)
+
 @router.get("/reports/{report_type}")
 async def generate_report(
     report_type: str,
-    background_tasks: BackgroundTasks,
+    request: Request,
     db_service: DatabaseService = Depends(get_database_service)
 ):
     """Generate PDF reports"""
-    valid_types = ["objects", "relations", "hierarchies", "full"]
-    if report_type not in valid_types:
+    if report_type not in REPORT_TYPES:
         raise HTTPException(status_code=400, detail="Invalid report type")
     
-    # Get data
-    objects = db_service.get_objects()
-    relations = db_service.get_relations()
-    hierarchies = db_service.get_hierarchies()
-    
-    # Generate appropriate report
-    if report_type == "objects":
-        pdf_buffer = report_service.generate_objects_report(objects)
-    elif report_type == "relations":
-        pdf_buffer = report_service.generate_relations_report(relations, objects)
-    elif report_type == "hierarchies":
-        pdf_buffer = report_service.generate_hierarchies_report(hierarchies, objects)
-    else:  # full
-        pdf_buffer = report_service.generate_full_report(objects, relations, hierarchies)
+    versions = db_service.get_catalog_versions()
+    etag = f'"{report_version(report_type, versions)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
     
-    # Return PDF file
-    from fastapi.responses import StreamingResponse
-    import io
+    # Served from the cache when the data hasn't changed, otherwise rendered on the worker pool
+    job = report_jobs.submit(report_type, versions)
+    await asyncio.wrap_future(job.future)
+    if job.status != "completed":
+        raise HTTPException(status_code=500, detail=f"Report failed: {job.error}")
     
-    def generate():
-        yield pdf_buffer.getvalue()
-    
-    filename = f"object-design-{report_type}-report-{datetime.now().strftime('%Y-%m-%d')}.pdf"
+    return _report_file_response(job, request)
+
+# Bulk export
+@router.get("/export")
+async def export_catalog(format: str = "ndjson", table: Optional[str] = None):
+    """Stream objects, types, relations and hierarchies as NDJSON, or one table as CSV or Arrow"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid export format, expected one of: {', '.join(EXPORT_FORMATS)}")
+    if table is not None and table not in EXPORT_TABLES:
+        raise HTTPException(status_code=400, detail=f"Invalid table, expected one of: {', '.join(EXPORT_TABLES)}")
+    if format != "ndjson" and table is None:
+        raise HTTPException(status_code=400, detail=f"{format} export holds one table; pass the table parameter")
+    if format == "arrow" and pa is None:
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow")
     
+    extension = "arrows" if format == "arrow" else format
+    filename = f"object-design-export{'-' + table if table else ''}-{datetime.date.today().isoformat()}.{extension}"
     return StreamingResponse(
-        generate(),
-        media_type="application/pdf",
+        export_service.stream(format, table),
+        media_type=EXPORT_FORMATS[format],
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
+
+# Bulk import
+@router.post("/import", response_model=ImportResult)
+async def import_catalog(request: Request, format: str = "ndjson", table: Optional[str] = None):
+    """Load an exported NDJSON bundle, or one table as Arrow, in a single transaction"""
+    if format not in ("ndjson", "arrow"):
+        raise HTTPException(status_code=400, detail="Invalid import format, expected one of: ndjson, arrow")
+    if format == "arrow":
+        if table not in EXPORT_TABLES:
+            raise HTTPException(status_code=400, detail=f"Arrow import holds one table; pass one of: {', '.join(EXPORT_TABLES)}")
+        if pa is None:
+            raise HTTPException(status_code=501, detail="Arrow import requires pyarrow")
+    
+    try:
+        return await import_service.import_bundle(request.stream(), format, table)
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=f"Import conflicts with existing data: {e.orig}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid import bundle: {str(e)}")
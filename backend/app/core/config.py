@@ -10,6 +10,69 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
     
+    # LLM provider: "openai" (any OpenAI-compatible endpoint) or "local" (deterministic, offline)
+    llm_provider: str = os.getenv("LLM_PROVIDER", "openai")
+    llm_model: str = os.getenv("LLM_MODEL", "gpt-5")
+    llm_base_url: Optional[str] = os.getenv("LLM_BASE_URL")
+    local_llm_latency_ms: float = float(os.getenv("LOCAL_LLM_LATENCY_MS", 200))
+    local_llm_tokens_per_second: float = float(os.getenv("LOCAL_LLM_TOKENS_PER_SECOND", 50))
+    local_llm_response_tokens: int = int(os.getenv("LOCAL_LLM_RESPONSE_TOKENS", 120))
+    
+    # Chat
+    chat_history_token_budget: int = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", 2000))
+    chat_summary_token_budget: int = int(os.getenv("CHAT_SUMMARY_TOKEN_BUDGET", 400))
+    chat_context_token_budget: int = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", 3000))
+    chat_context_max_objects: int = int(os.getenv("CHAT_CONTEXT_MAX_OBJECTS", 25))
+    
+    # Search
+    # Candidates are split into shards of this many tokens so each prompt fits the model context
+    search_shard_token_budget: int = int(os.getenv("SEARCH_SHARD_TOKEN_BUDGET", 8000))
+    search_shard_concurrency: int = int(os.getenv("SEARCH_SHARD_CONCURRENCY", 4))
+    search_shard_timeout: float = float(os.getenv("SEARCH_SHARD_TIMEOUT", 20))
+    search_rerank_candidates: int = int(os.getenv("SEARCH_RERANK_CANDIDATES", 40))
+    search_top_k: int = int(os.getenv("SEARCH_TOP_K", 10))
+    # Past this deadline /search answers from the local full-text ranking instead
+    search_deadline_ms: int = int(os.getenv("SEARCH_DEADLINE_MS", 8000))
+    
+    # Reports
+    report_storage_dir: str = os.getenv("REPORT_STORAGE_DIR", "reports")
+    report_workers: int = int(os.getenv("REPORT_WORKERS", 2))
+    report_ttl_seconds: int = int(os.getenv("REPORT_TTL_SECONDS", 3600))
+    # In-memory report output beyond this size spills to a temp file
+    report_spool_max_bytes: int = int(os.getenv("REPORT_SPOOL_MAX_BYTES", 8 * 1024 * 1024))
+    # Full reports with at least this many rows are rendered in chunks on a process pool
+    report_parallel_min_rows: int = int(os.getenv("REPORT_PARALLEL_MIN_ROWS", 5000))
+    report_chunk_rows: int = int(os.getenv("REPORT_CHUNK_ROWS", 2000))
+    report_render_processes: int = int(os.getenv("REPORT_RENDER_PROCESSES", os.cpu_count() or 1))
+    
+    # Object facets
+    facet_cache_entries: int = int(os.getenv("FACET_CACHE_ENTRIES", 256))
+    # Most frequent values returned per attribute key
+    facet_value_limit: int = int(os.getenv("FACET_VALUE_LIMIT", 50))
+    
+    # Change events
+    # 'memory' serves a single worker; 'postgres' relays events through LISTEN/NOTIFY to every worker
+    event_backend: str = os.getenv("EVENT_BACKEND", "memory")
+    event_channel: str = os.getenv("EVENT_CHANNEL", "object_changes")
+    # Distinct pending changes per client before it is told to resync from /changes
+    event_client_buffer: int = int(os.getenv("EVENT_CLIENT_BUFFER", 1000))
+    event_coalesce_ms: int = int(os.getenv("EVENT_COALESCE_MS", 200))
+    event_heartbeat_seconds: float = float(os.getenv("EVENT_HEARTBEAT_SECONDS", 15))
+    
+    # Batch writes
+    batch_max_operations: int = int(os.getenv("BATCH_MAX_OPERATIONS", 500))
+    
+    # Integrity sweeper
+    # Seconds between background passes repairing references to deleted objects; 0 disables it
+    integrity_sweep_interval_seconds: float = float(os.getenv("INTEGRITY_SWEEP_INTERVAL_SECONDS", 3600))
+    integrity_sweep_batch_size: int = int(os.getenv("INTEGRITY_SWEEP_BATCH_SIZE", 500))
+    # Pause between batches, so a pass never holds the database for long
+    integrity_sweep_pause_ms: int = int(os.getenv("INTEGRITY_SWEEP_PAUSE_MS", 200))
+    
+    # Object tables
+    # 'rows' keeps one row per record; 'columnar' stores each table as one compressed columnar blob
+    table_storage_encoding: str = os.getenv("TABLE_STORAGE_ENCODING", "rows")
+    
     # Server
     port: int = int(os.getenv("PORT", 8000))
     host: str = os.getenv("HOST", "0.0.0.0")
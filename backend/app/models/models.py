@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Text, JSON, TIMESTAMP, Integer, ForeignKey, func, Table
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import Column, String, Text, JSON, TIMESTAMP, Integer, BigInteger, Boolean, ForeignKey, func, cast, Table, UniqueConstraint, Index, LargeBinary, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship, backref, deferred
 from app.db.base import Base
 import uuid
 from datetime import datetime
@@ -19,7 +19,9 @@ relation_secondary_objects = Table(
     'relation_secondary_objects',
     Base.metadata,
     Column('relation_id', UUID(as_uuid=True), ForeignKey('relations.id'), primary_key=True),
-    Column('object_id', UUID(as_uuid=True), ForeignKey('objects.id'), primary_key=True)
+    Column('object_id', UUID(as_uuid=True), ForeignKey('objects.id'), primary_key=True),
+    # The primary key leads with relation_id; this serves lookups by object
+    Index('ix_relation_secondary_objects_object_id', 'object_id')
 )
 
 class Types(Base):
@@ -34,24 +36,68 @@ class Types(Base):
 
 class ObjectType(Base):
     __tablename__ = "objects"
+    __table_args__ = (
+        Index('ix_objects_attributes', 'attributes', postgresql_using='gin'),
+        # Serves name prefix filters (LIKE 'prefix%') whatever the database collation
+        Index('ix_objects_name_prefix', 'name', postgresql_ops={'name': 'text_pattern_ops'}),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=False)
-    type = Column(String, nullable=False)  # 'Item' | 'Document'
-    attributes = Column(JSON, default={})
-    tables = Column(JSON, default=[])
+    type = Column(String, nullable=False, index=True)  # 'Item' | 'Document'
+    # JSONB so attribute filters can use the GIN index
+    attributes = Column(JSONB, default={})
     created_date = Column(TIMESTAMP, server_default=func.now())
-    modified_date = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    modified_date = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), index=True)
     revision = Column(Integer, default=1)
     
     # Relationships
+    # Table definitions only; rows are loaded by range from ObjectTableRow
+    tables = relationship("ObjectTable",
+                          order_by="ObjectTable.position",
+                          back_populates="object",
+                          cascade="all, delete-orphan",
+                          passive_deletes=True,
+                          lazy="selectin")
     primary_relations = relationship("Relation", 
                                    foreign_keys="Relation.primary_object_id",
                                    back_populates="primary_object")
     secondary_relations = relationship("Relation", 
                                      secondary=relation_secondary_objects,
                                      back_populates="secondary_objects")
+# Full-text document over name and description; rank_objects_fulltext queries this same expression
+object_search_document = func.to_tsvector(
+    text("'simple'"),
+    func.coalesce(ObjectType.name, '') + ' ' + func.coalesce(ObjectType.description, '')
+)
+Index('ix_objects_search_document', object_search_document, postgresql_using='gin')
+
+
+class ObjectTable(Base):
+    __tablename__ = "object_tables"
+    __table_args__ = (UniqueConstraint('object_id', 'name'),)
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    object_id = Column(UUID(as_uuid=True), ForeignKey("objects.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    columns = Column(JSON, default=[])
+    row_count = Column(Integer, nullable=False, default=0)
+    # Rows in app.utils.columnar format when stored columnar; object_table_rows is empty then
+    encoded_data = deferred(Column(LargeBinary, nullable=True))
+    
+    # Relationships
+    object = relationship("ObjectType", back_populates="tables")
+
+
+class ObjectTableRow(Base):
+    __tablename__ = "object_table_rows"
+    
+    # row_index runs 0..row_count-1, so a page is a primary key range scan
+    table_id = Column(UUID(as_uuid=True), ForeignKey("object_tables.id", ondelete="CASCADE"), primary_key=True)
+    row_index = Column(Integer, primary_key=True)
+    cells = Column(JSON, nullable=False)
 
 class RelationType(Base):
     __tablename__ = "relation_types"
@@ -65,7 +111,7 @@ class Relation(Base):
     __tablename__ = "relations"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    primary_object_id = Column(UUID(as_uuid=True), ForeignKey("objects.id"), nullable=False)
+    primary_object_id = Column(UUID(as_uuid=True), ForeignKey("objects.id"), nullable=False, index=True)
     relation_type = Column(String, nullable=False)
     description = Column(Text)
     
@@ -85,7 +131,7 @@ class HierarchyType(Base):
     __tablename__ = "hierarchy_type"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    object_type = Column(Integer, nullable=True)
+    object_type = Column(Integer, nullable=True, index=True)
     inventory = Column(JSON, nullable=True)
     purchase = Column(JSON, nullable=True)
 
@@ -95,7 +141,67 @@ class Hierarchy(Base):
     __tablename__ = "hierarchies"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    parent_object_id = Column(UUID(as_uuid=True))
+    parent_object_id = Column(UUID(as_uuid=True), index=True)
     child_object_ids = Column(JSON, default=[])
     level = Column(Integer, default=0)
     properties = Column(JSON, default={})
+
+
+# Child membership lookups cast to JSONB (?, ?| and @>), so the GIN index is on that expression
+Index('ix_hierarchies_child_object_ids', cast(Hierarchy.child_object_ids, JSONB), postgresql_using='gin')
+
+
+class CatalogCounter(Base):
+    __tablename__ = "catalog_counters"
+    
+    # One row per entity kind ('objects' | 'relations' | 'hierarchies' | 'types'), bumped on every write
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    __table_args__ = (
+        UniqueConstraint('entity', 'entity_id'),
+        Index('ix_change_log_txid_seq', 'txid', 'seq'),
+    )
+    
+    # Latest change per entity row; deletes stay behind as tombstones
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)  # 'objects' | 'relations' | 'hierarchies'
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    # Writing transaction (txid_current()); the feed only reads transactions older than every open one
+    txid = Column(BigInteger, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_date = Column(TIMESTAMP, server_default=func.now())
+
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Rolling summary of every message with seq <= summarized_seq
+    summary = Column(Text, nullable=True)
+    summarized_seq = Column(Integer, default=0)
+    message_count = Column(Integer, default=0)
+    created_date = Column(TIMESTAMP, server_default=func.now())
+    
+    # Relationships
+    messages = relationship("ChatMessage",
+                            order_by="ChatMessage.seq",
+                            back_populates="session")
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+    __table_args__ = (UniqueConstraint('session_id', 'seq'),)
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("chat_sessions.id"), nullable=False, index=True)
+    seq = Column(Integer, nullable=False)
+    role = Column(String, nullable=False)  # 'user' | 'assistant'
+    content = Column(Text, nullable=False)
+    timestamp = Column(TIMESTAMP, server_default=func.now())
+    
+    # Relationships
+    session = relationship("ChatSession", back_populates="messages")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import uuid
@@ -26,6 +26,24 @@ class TableColumn(BaseModel):
 class TableData(BaseModel):
     name: str
     columns: List[str]
+
+class TableDataCreate(TableData):
+    # Rows replace the table's rows; omit them on update to keep the stored rows
+    data: Optional[List[List[Any]]] = None
+
+class ObjectTableData(TableData):
+    row_count: int = 0
+    
+    class Config:
+        from_attributes = True
+
+class TableRowsPage(BaseModel):
+    name: str
+    columns: List[str]
+    row_count: int
+    offset: int
+    limit: int
+    rows: List[List[Any]]
    
 
 class TypesBase(BaseModel):
@@ -54,18 +72,32 @@ class ObjectBase(BaseModel):
     attributes: Dict[str, Any] = {}
     tables: List[TableData] = []
 
+def _unique_table_names(tables):
+    # object_tables is unique on (object_id, name); reject repeats before they reach the database
+    if tables:
+        names = [table.name for table in tables]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate table names: {', '.join(duplicates)}")
+    return tables
+
 class ObjectCreate(ObjectBase):
-    pass
+    tables: List[TableDataCreate] = []
+
+    _check_tables = field_validator('tables')(_unique_table_names)
 
 class ObjectUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     type: Optional[str] = None
     attributes: Optional[Dict[str, Any]] = None
-    tables: Optional[List[TableData]] = None
+    tables: Optional[List[TableDataCreate]] = None
+
+    _check_tables = field_validator('tables')(_unique_table_names)
 
 class ObjectType(ObjectBase):
     id: uuid.UUID
+    tables: List[ObjectTableData] = []
     created_date: datetime
     modified_date: datetime
     revision: int
@@ -73,6 +105,18 @@ class ObjectType(ObjectBase):
     class Config:
         from_attributes = True
 
+class ObjectTypeFacet(BaseModel):
+    id: int
+    object_type: str
+    parid: int
+    count: int
+
+class ObjectFacets(BaseModel):
+    total: int
+    types: Dict[str, int]  # objects per `type` value
+    object_types: List[ObjectTypeFacet]  # every defined object type, including empty ones
+    attributes: Dict[str, Dict[str, int]]  # per requested key, most frequent values first
+
 # Relation Type schemas
 class RelationTypeBase(BaseModel):
     id: Optional[int] = None
@@ -154,22 +198,100 @@ class Hierarchy(HierarchyBase):
         from_attributes = True
 
 
+# Expanded object schemas (GET /objects?expand=...); only requested fields are present
+class ObjectSummary(BaseModel):
+    id: uuid.UUID
+    name: str
+    type: str
+    
+    class Config:
+        from_attributes = True
+
+class ExpandedRelation(Relation):
+    secondary_objects: List[ObjectSummary] = []
+
+class ExpandedObject(ObjectType):
+    relations: List[ExpandedRelation] = []  # relations with the object as primary
+    hierarchy: List[Hierarchy] = []  # hierarchies the object heads
+    object_type: Optional[TypesBase] = None
+    hierarchy_type: Optional[HierarchyTypeBase] = None
+
+class ObjectUsage(BaseModel):
+    offset: int
+    limit: int
+    relation_total: int
+    relation_counts: Dict[str, int]  # per relation_type
+    relations: List[Relation]  # relations with the object among their secondaries
+    hierarchy_total: int
+    hierarchies: List[Hierarchy]  # hierarchies with the object among their children
+
+
+# Batch schemas
+class BatchOperation(BaseModel):
+    op: str  # 'create' | 'update' | 'delete'
+    resource: str  # 'objects' | 'relations' | 'hierarchies'
+    id: Optional[str] = None  # update and delete; may be "$<ref>"
+    ref: Optional[str] = None  # create; names the new id for later operations
+    data: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    resource: str
+    status: int
+    id: uuid.UUID
+    ref: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None  # the written row; None for deletes
+
+class BatchResponse(BaseModel):
+    results: List[BatchOperationResult]
+
+
+# Change feed schemas
+class DeletedIds(BaseModel):
+    objects: List[uuid.UUID] = []
+    relations: List[uuid.UUID] = []
+    hierarchies: List[uuid.UUID] = []
+
+class ChangeFeed(BaseModel):
+    cursor: str  # pass back as ?since= for the next page
+    has_more: bool
+    objects: List[ObjectType] = []
+    relations: List[Relation] = []
+    hierarchies: List[Hierarchy] = []
+    deleted: DeletedIds = DeletedIds()
+
+
 # Chat schemas
-class ChatMessage(BaseModel):
-    id: str
+class ChatMessageBase(BaseModel):
     role: str  # 'user' | 'assistant'
     content: str
+
+class ChatMessageCreate(ChatMessageBase):
+    pass
+
+class ChatMessage(ChatMessageBase):
+    id: uuid.UUID
+    seq: int
     timestamp: datetime
+    
+    class Config:
+        from_attributes = True
 
 class ChatSessionBase(BaseModel):
-    messages: List[ChatMessage] = []
+    summary: Optional[str] = None
 
 class ChatSessionCreate(ChatSessionBase):
     pass
 
 class ChatSession(ChatSessionBase):
     id: uuid.UUID
+    summarized_seq: int
     created_date: datetime
+    messages: List[ChatMessage] = []
     
     class Config:
         from_attributes = True
@@ -178,6 +300,7 @@ class ChatSession(ChatSessionBase):
 # API request/response schemas
 class SearchRequest(BaseModel):
     query: str
+    deadlineMs: Optional[int] = Field(default=None, gt=0)
 
 class SearchResult(BaseModel):
     object: ObjectType
@@ -188,6 +311,8 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
     query: str
     reasoning: str
+    degraded: bool = False
+    degradedReason: Optional[str] = None
 
 class ChatRequest(BaseModel):
     message: str
@@ -196,3 +321,34 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     message: str
     sessionId: str
+
+
+# Report job schemas
+class ReportJobCreate(BaseModel):
+    report_type: str  # 'objects' | 'relations' | 'hierarchies' | 'full'
+
+class ReportJobStatus(BaseModel):
+    id: uuid.UUID
+    report_type: str
+    status: str  # 'queued' | 'running' | 'completed' | 'failed'
+    progress: float
+    error: Optional[str] = None
+    created_date: datetime
+    completed_date: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+
+# Bulk import schemas
+class ImportRejectedRow(BaseModel):
+    line: int  # line of the NDJSON bundle, or row of the Arrow stream
+    table: Optional[str] = None
+    reason: str
+
+class ImportTableResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+
+class ImportResult(BaseModel):
+    tables: Dict[str, ImportTableResult]
+    rejected_count: int
+    rejected: List[ImportRejectedRow]  # first IMPORT_MAX_REPORTED_REJECTS only
@@ -1,34 +1,163 @@
-import openai
-from typing import List, Dict, Any
+import asyncio
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from app.services.database import DatabaseService
-from app.schemas.schemas import SearchResult, SearchResponse, ChatResponse
-from app.models.models import ObjectType
+from app.services.context_service import ContextBuilder
+from app.services.llm_provider import LLMProvider
+from app.schemas.schemas import SearchResult, SearchResponse, ChatResponse, ChatSessionCreate, ChatMessageCreate
+from app.models.models import ObjectType, ChatMessage
+from app.core.config import settings
+from app.utils.tokens import estimate_tokens
+from app.utils.metrics import search_stats
 import json
+import time
 import uuid
-from datetime import datetime
 
 
 class AIService:
-    def __init__(self, api_key: str):
-        self.client = openai.OpenAI(api_key=api_key)
+    def __init__(self, provider: LLMProvider, session_factory: Callable[[], Session]):
+        self.provider = provider
+        self.session_factory = session_factory
+        self.context_builder = ContextBuilder(
+            settings.chat_context_token_budget,
+            settings.chat_context_max_objects
+        )
 
-    async def search_objects(self, query: str, db_service: DatabaseService) -> SearchResponse:
+    async def search_objects(self, query: str) -> SearchResponse:
         """AI-powered semantic search across objects"""
-        # Get all objects for search
-        all_objects = db_service.get_objects()
+        # Off the event loop, so a slow catalog load stays cancellable by the caller's deadline
+        objects_by_id, entries, shards = await asyncio.to_thread(self._load_candidates)
+        if len(shards) <= 1:
+            ai_response = await asyncio.to_thread(self._score_entries, query, list(entries.values()))
+            scored = ai_response.get('results', [])
+            query_analysis = ai_response.get('query_analysis')
+        else:
+            scored, query_analysis = await self._map_reduce_search(query, shards, entries)
         
+        # Map AI results to full objects
+        search_results = []
+        for result in scored:
+            object_match = objects_by_id.get(str(result.get('object_id')))
+            if object_match:
+                search_results.append(SearchResult(
+                    object=object_match,
+                    relevance=result.get('relevance', 0),
+                    reasoning=result.get('reasoning', '')
+                ))
+
+        return SearchResponse(
+            results=search_results,
+            query=query,
+            reasoning=query_analysis or 'No analysis provided'
+        )
+
+    async def search_with_deadline(self, query: str, db_service: DatabaseService, deadline_ms: int) -> SearchResponse:
+        """AI search that falls back to the local full-text ranking when the model misses the deadline"""
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(self.search_objects(query), timeout=deadline_ms / 1000)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "deadline_exceeded"
+            response = self.local_search(query, db_service, outcome)
+        except Exception:
+            outcome = "model_error"
+            response = self.local_search(query, db_service, outcome)
+
+        search_stats.record((time.monotonic() - started) * 1000, outcome)
+        return response
+
+    def local_search(self, query: str, db_service: DatabaseService, reason: str) -> SearchResponse:
+        """Rank objects with Postgres full-text search and mark the response as degraded"""
+        terms = [term.replace('-', '') for term in ContextBuilder.extract_terms(query)]
+        ranked = db_service.rank_objects_fulltext([term for term in terms if term], settings.search_top_k)
+        best_rank = max((rank for _, rank in ranked), default=0) or 1
+
+        return SearchResponse(
+            results=[SearchResult(
+                object=obj,
+                relevance=round(rank / best_rank, 3),
+                reasoning="Full-text match on name or description"
+            ) for obj, rank in ranked],
+            query=query,
+            reasoning="AI ranking unavailable; showing full-text matches",
+            degraded=True,
+            degradedReason=reason
+        )
+
+    def _load_candidates(self) -> Tuple[Dict[str, ObjectType], Dict[str, Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """Objects by id, their search entries, and the entries split into shards.
+        Runs on a worker thread with its own session: when the deadline fires the thread
+        finishes in the background and never shares the request's session with the fallback"""
+        db = self.session_factory()
+        try:
+            # Table definitions are eagerly loaded, so the objects stay usable once detached
+            all_objects = DatabaseService(db).get_objects()
+        finally:
+            db.close()
+        objects_by_id = {str(obj.id): obj for obj in all_objects}
+        entries = {object_id: self._search_entry(obj) for object_id, obj in objects_by_id.items()}
+        return objects_by_id, entries, self._shard_entries(list(entries.values()), settings.search_shard_token_budget)
+
+    async def _map_reduce_search(self, query: str, shards: List[List[Dict[str, Any]]], entries: Dict[str, Dict[str, Any]]):
+        """Score shards concurrently, merge, then rerank the best candidates in one prompt"""
+        semaphore = asyncio.Semaphore(settings.search_shard_concurrency)
+
+        def release(call: asyncio.Future) -> None:
+            semaphore.release()
+            # Retrieved here, since a timed-out caller no longer awaits it
+            if not call.cancelled():
+                call.exception()
+
+        async def score_shard(shard: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            await semaphore.acquire()
+            # The thread can't be cancelled, so its slot is freed only when the provider call returns
+            call = asyncio.ensure_future(asyncio.to_thread(self._score_entries, query, shard))
+            call.add_done_callback(release)
+            try:
+                return await asyncio.wait_for(asyncio.shield(call), timeout=settings.search_shard_timeout)
+            except Exception:
+                # A slow or failing shard only loses its own candidates
+                return None
+
+        shard_responses = [r for r in await asyncio.gather(*(score_shard(s) for s in shards)) if r is not None]
+        if not shard_responses:
+            raise RuntimeError("All search shards failed or timed out")
+
+        # Keep the best score per object across shards
+        merged = {}
+        for response in shard_responses:
+            for result in response.get('results', []):
+                object_id = str(result.get('object_id'))
+                if object_id in entries and (
+                    object_id not in merged or self._relevance(result) > self._relevance(merged[object_id])
+                ):
+                    merged[object_id] = result
+        candidates = sorted(merged.values(), key=self._relevance, reverse=True)[:settings.search_rerank_candidates]
+        query_analysis = next((r['query_analysis'] for r in shard_responses if r.get('query_analysis')), None)
+
+        # Scores from different shards aren't directly comparable, so rerank the survivors together
+        results = candidates
+        if len(candidates) > 1:
+            try:
+                reranked = await asyncio.wait_for(
+                    asyncio.to_thread(self._score_entries, query, [entries[str(c['object_id'])] for c in candidates]),
+                    timeout=settings.search_shard_timeout
+                )
+                results = reranked.get('results') or candidates
+                query_analysis = reranked.get('query_analysis') or query_analysis
+            except Exception:
+                pass
+
+        return sorted(results, key=self._relevance, reverse=True)[:settings.search_top_k], query_analysis
+
+    def _score_entries(self, query: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Use AI to analyze the query and find relevant objects
         prompt = f"""
         Analyze this search query: "{query}"
         
-        Available objects:
-        {json.dumps([{
-            'id': str(obj.id),
-            'name': obj.name,
-            'description': obj.description,
-            'type': obj.type,
-            'attributes': obj.attributes
-        } for obj in all_objects], indent=2)}
+        Available objects (one JSON document per line):
+        {chr(10).join(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) for entry in entries)}
         
         Find the most relevant objects based on the query. Consider object names, descriptions, attributes, and content.
         Return your response as JSON in this format:
@@ -44,9 +173,8 @@ class AIService:
         }}
         """
 
-        response = self.client.chat.completions.create(
-            model="gpt-5",
-            messages=[
+        content = self.provider.complete(
+            [
                 {
                     "role": "system",
                     "content": "You are an intelligent search assistant that helps find relevant objects based on user queries. Respond with JSON only."
@@ -56,27 +184,39 @@ class AIService:
                     "content": prompt
                 }
             ],
-            response_format={"type": "json_object"}
+            json_mode=True,
+            timeout=settings.search_shard_timeout
         )
 
-        ai_response = json.loads(response.choices[0].message.content or '{}')
-        
-        # Map AI results to full objects
-        search_results = []
-        for result in ai_response.get('results', []):
-            object_match = next((obj for obj in all_objects if str(obj.id) == result['object_id']), None)
-            if object_match:
-                search_results.append(SearchResult(
-                    object=object_match,
-                    relevance=result['relevance'],
-                    reasoning=result['reasoning']
-                ))
+        return json.loads(content or '{}')
 
-        return SearchResponse(
-            results=search_results,
-            query=query,
-            reasoning=ai_response.get('query_analysis', 'No analysis provided')
-        )
+    def _search_entry(self, obj: ObjectType) -> Dict[str, Any]:
+        return {
+            'id': str(obj.id),
+            'name': obj.name,
+            'description': obj.description,
+            'type': obj.type,
+            'attributes': obj.attributes
+        }
+
+    def _shard_entries(self, entries: List[Dict[str, Any]], token_budget: int) -> List[List[Dict[str, Any]]]:
+        shards = [[]]
+        shard_tokens = 0
+        for entry in entries:
+            entry_tokens = estimate_tokens(json.dumps(entry, separators=(",", ":"), ensure_ascii=False))
+            if shards[-1] and shard_tokens + entry_tokens > token_budget:
+                shards.append([])
+                shard_tokens = 0
+            shards[-1].append(entry)
+            shard_tokens += entry_tokens
+        return shards
+
+    @staticmethod
+    def _relevance(result: Dict[str, Any]) -> float:
+        try:
+            return float(result.get('relevance', 0))
+        except (TypeError, ValueError):
+            return 0.0
 
     async def chat_with_context(self, message: str, session_id: str, db_service: DatabaseService) -> ChatResponse:
         """AI chat with object context awareness"""
@@ -88,72 +228,103 @@ class AIService:
             session = None
 
         if not session:
-            # Create new session
-            from app.schemas.schemas import ChatSessionCreate
             session = db_service.create_chat_session(ChatSessionCreate())
 
-        # Get context from objects
-        all_objects = db_service.get_objects()
+        # Only turns newer than the rolling summary are replayed verbatim
+        history = db_service.get_chat_messages(session.id, after_seq=session.summarized_seq or 0)
+
+        # Only objects relevant to this message, capped by the context token budget
+        catalog_context = self.context_builder.build(message, db_service)
         
         context_prompt = f"""
         You are an AI assistant for an Object Design System. Help users with questions about objects, their relationships, and hierarchies.
         
-        Available objects:
-        {json.dumps([{
-            'id': str(obj.id),
-            'name': obj.name,
-            'description': obj.description,
-            'type': obj.type,
-            'attributes': obj.attributes
-        } for obj in all_objects], indent=2)}
+        Relevant objects, relations and hierarchies (one JSON document per line):
+        {catalog_context or "No matching objects found."}
         
-        Previous conversation:
-        {json.dumps(session.messages, indent=2)}
+        Summary of earlier conversation:
+        {session.summary or "None"}
+        
+        Recent conversation:
+        {self._format_history(history) or "None"}
         
         Current user message: "{message}"
         
         Provide a helpful response about the objects or system. If the user is asking about specific objects, reference them by name and provide details.
         """
 
-        response = self.client.chat.completions.create(
-            model="gpt-5",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful AI assistant for an Object Design System. Provide clear, informative responses about objects, their properties, relationships, and hierarchies."
-                },
-                {
-                    "role": "user",
-                    "content": context_prompt
-                }
-            ]
-        )
+        # Provider calls block, so keep them off the event loop
+        content = await asyncio.to_thread(self.provider.complete, [
+            {
+                "role": "system",
+                "content": "You are a helpful AI assistant for an Object Design System. Provide clear, informative responses about objects, their properties, relationships, and hierarchies."
+            },
+            {
+                "role": "user",
+                "content": context_prompt
+            }
+        ])
 
-        assistant_message = response.choices[0].message.content or "I couldn't generate a response."
+        assistant_message = content or "I couldn't generate a response."
 
-        # Update session with new messages
-        from app.schemas.schemas import ChatMessage, ChatSessionCreate
-        
-        current_messages = session.messages if isinstance(session.messages, list) else []
-        
-        updated_messages = current_messages + [
-            ChatMessage(
-                id=f"{uuid.uuid4()}-{datetime.utcnow().timestamp()}-user",
-                role="user",
-                content=message,
-                timestamp=datetime.utcnow()
-            ),
-            ChatMessage(
-                id=f"{uuid.uuid4()}-{datetime.utcnow().timestamp()}-assistant",
-                role="assistant",
-                content=assistant_message,
-                timestamp=datetime.utcnow()
-            )
-        ]
-
-        db_service.update_chat_session(session.id, ChatSessionCreate(messages=updated_messages))
+        # Append the new turn to the session log
+        db_service.append_chat_messages(session.id, [
+            ChatMessageCreate(role="user", content=message),
+            ChatMessageCreate(role="assistant", content=assistant_message)
+        ])
+
+        await self._compact_history(session.id, db_service)
 
         return ChatResponse(
             message=assistant_message,
             sessionId=str(session.id)
         )
+
+    def _format_history(self, messages: List[ChatMessage]) -> str:
+        return "\n".join(f"{message.role}: {message.content}" for message in messages)
+
+    async def _compact_history(self, session_id: uuid.UUID, db_service: DatabaseService) -> None:
+        """Fold the oldest turns into the session summary once history exceeds the token budget"""
+        session = db_service.get_chat_session(session_id)
+        history = db_service.get_chat_messages(session_id, after_seq=session.summarized_seq or 0)
+
+        budget = settings.chat_history_token_budget
+        total_tokens = sum(estimate_tokens(self._format_history([m])) for m in history)
+        if total_tokens <= budget:
+            return
+
+        # Fold down to half the budget so summarization runs every few turns, not every turn
+        folded = []
+        for chat_message in history[:-1]:
+            if total_tokens <= budget // 2:
+                break
+            folded.append(chat_message)
+            total_tokens -= estimate_tokens(self._format_history([chat_message]))
+
+        if not folded:
+            return
+
+        summary_prompt = f"""
+        Current summary of the conversation:
+        {session.summary or "None"}
+        
+        New messages:
+        {self._format_history(folded)}
+        
+        Update the summary so it covers the new messages. Keep object names, decisions and open questions.
+        Use at most {settings.chat_summary_token_budget * 3 // 4} words.
+        """
+
+        content = await asyncio.to_thread(self.provider.complete, [
+            {
+                "role": "system",
+                "content": "You maintain a concise running summary of a conversation about an Object Design System."
+            },
+            {
+                "role": "user",
+                "content": summary_prompt
+            }
+        ])
+
+        summary = content or session.summary or ""
+        db_service.update_chat_session_summary(session_id, summary, folded[-1].seq)
@@ -0,0 +1,109 @@
+"""Ordered batches of entity writes in a single transaction.
+
+A create may name its new id with "ref"; later operations use "$<ref>"
+in their id or in any object id field of their data. Every operation
+runs through the usual DatabaseService methods, which only flush inside
+the batch; the whole batch commits once, or not at all.
+"""
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from typing import List, Dict, Any, Callable, Optional, Tuple, Type
+from app.services.database import DatabaseService
+from app.schemas.schemas import (
+    ObjectCreate, ObjectUpdate, ObjectType, RelationCreate, RelationUpdate, Relation,
+    HierarchyCreate, HierarchyUpdate, Hierarchy, BatchOperation, BatchOperationResult
+)
+import uuid
+
+
+# (resource, op) -> input schema and the DatabaseService call taking (id, data)
+BATCH_OPERATIONS: Dict[Tuple[str, str], Tuple[Optional[Type[BaseModel]], Callable]] = {
+    ("objects", "create"): (ObjectCreate, lambda db_service, row_id, data: db_service.create_object(data)),
+    ("objects", "update"): (ObjectUpdate, lambda db_service, row_id, data: db_service.update_object(row_id, data)),
+    ("objects", "delete"): (None, lambda db_service, row_id, data: db_service.delete_object(row_id)),
+    ("relations", "create"): (RelationCreate, lambda db_service, row_id, data: db_service.create_relation(data)),
+    ("relations", "update"): (RelationUpdate, lambda db_service, row_id, data: db_service.update_relation(row_id, data)),
+    ("relations", "delete"): (None, lambda db_service, row_id, data: db_service.delete_relation(row_id)),
+    ("hierarchies", "create"): (HierarchyCreate, lambda db_service, row_id, data: db_service.create_hierarchy(data)),
+    ("hierarchies", "update"): (HierarchyUpdate, lambda db_service, row_id, data: db_service.update_hierarchy(row_id, data)),
+    ("hierarchies", "delete"): (None, lambda db_service, row_id, data: db_service.delete_hierarchy(row_id)),
+}
+RESULT_SCHEMAS = {"objects": ObjectType, "relations": Relation, "hierarchies": Hierarchy}
+# Data fields holding object ids, where "$<ref>" is replaced
+REFERENCE_FIELDS = {"primary_object_id", "secondary_object_ids", "parent_object_id", "child_object_ids"}
+STATUS_CODES = {"create": 201, "update": 200, "delete": 204}
+
+
+class BatchOperationError(Exception):
+    def __init__(self, index: int, status_code: int, detail: str):
+        super().__init__(detail)
+        self.index = index
+        self.status_code = status_code
+        self.detail = detail
+
+
+def run_batch(db_service: DatabaseService, operations: List[BatchOperation]) -> List[BatchOperationResult]:
+    """Apply the operations in order and commit once; raises BatchOperationError after rolling back"""
+    refs: Dict[str, uuid.UUID] = {}
+    results = []
+    with db_service.batch():
+        for index, operation in enumerate(operations):
+            results.append(_run_operation(db_service, index, operation, refs))
+    return results
+
+
+def _run_operation(db_service: DatabaseService, index: int, operation: BatchOperation, refs: Dict[str, uuid.UUID]) -> BatchOperationResult:
+    if (operation.resource, operation.op) not in BATCH_OPERATIONS:
+        raise BatchOperationError(index, 400, f"Unsupported operation '{operation.op}' on '{operation.resource}'")
+    schema, call = BATCH_OPERATIONS[(operation.resource, operation.op)]
+
+    row_id = None
+    if operation.op != "create":
+        if not operation.id:
+            raise BatchOperationError(index, 400, "Missing id")
+        try:
+            row_id = uuid.UUID(_resolve(operation.id, refs, index))
+        except ValueError:
+            raise BatchOperationError(index, 400, "Invalid ID format")
+
+    data = None
+    if schema is not None:
+        values = {
+            field: _resolve(value, refs, index) if field in REFERENCE_FIELDS else value
+            for field, value in operation.data.items()
+        }
+        try:
+            data = schema.model_validate(values)
+        except ValidationError as e:
+            raise BatchOperationError(index, 422, str(e))
+
+    try:
+        row = call(db_service, row_id, data)
+    except IntegrityError as e:
+        raise BatchOperationError(index, 409, str(e.orig))
+    if not row:
+        raise BatchOperationError(index, 404, f"{operation.resource} {row_id} not found")
+
+    if operation.op == "create" and operation.ref:
+        refs[operation.ref] = row.id
+    return BatchOperationResult(
+        index=index,
+        op=operation.op,
+        resource=operation.resource,
+        status=STATUS_CODES[operation.op],
+        id=row_id or row.id,
+        ref=operation.ref,
+        data=None if operation.op == "delete" else RESULT_SCHEMAS[operation.resource].model_validate(row).model_dump(mode="json")
+    )
+
+
+def _resolve(value: Any, refs: Dict[str, uuid.UUID], index: int) -> Any:
+    """Replace "$<ref>" strings, also inside lists, with the ids created earlier in the batch"""
+    if isinstance(value, list):
+        return [_resolve(item, refs, index) for item in value]
+    if isinstance(value, str) and value.startswith("$"):
+        if value[1:] not in refs:
+            raise BatchOperationError(index, 400, f"Unknown reference '{value}'")
+        return str(refs[value[1:]])
+    return value
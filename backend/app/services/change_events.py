@@ -0,0 +1,160 @@
+"""Change notifications for connected clients.
+
+DatabaseService stages an event for every object, relation and hierarchy
+write. Events reach subscribers only once the transaction commits: the
+in-process backend publishes from the session's after_commit hook, and
+the Postgres backend sends them with pg_notify inside the transaction, so
+every worker listening on the channel receives them on commit.
+
+Each subscriber buffers events keyed by (entity, id), so a burst of edits
+to one row reaches the client once. A client that falls further behind
+than its buffer is dropped to a single resync event, after which it reads
+the delta feed (/changes) instead of holding up publishers.
+"""
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+from collections import OrderedDict
+from app.core.config import settings
+import asyncio
+import json
+import psycopg2
+import select as select_module
+import threading
+
+
+# Sent in place of events a client fell too far behind to receive
+RESYNC = "resync"
+
+
+class Subscription:
+    """One client's coalescing, bounded event buffer"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.loop = loop
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[Tuple[str, Optional[str]], Dict[str, Any]]" = OrderedDict()
+        self._overflowed = False
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def offer(self, events: List[Dict[str, Any]]) -> None:
+        """Called from any thread; never blocks the publisher"""
+        with self._lock:
+            if not self._overflowed:
+                for change in events:
+                    key = (change["entity"], change["id"])
+                    self._pending.pop(key, None)
+                    self._pending[key] = change
+                if len(self._pending) > self.max_pending:
+                    self._pending.clear()
+                    self._overflowed = True
+        self.loop.call_soon_threadsafe(self._ready.set)
+
+    def offer_resync(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._overflowed = True
+        self.loop.call_soon_threadsafe(self._ready.set)
+
+    async def next_batch(self, coalesce_seconds: float, timeout: float) -> Optional[Any]:
+        """Events gathered over the coalescing window, RESYNC after an overflow, or None on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        # Let the rest of a burst arrive and merge before sending
+        await asyncio.sleep(coalesce_seconds)
+        with self._lock:
+            self._ready.clear()
+            if self._overflowed:
+                self._overflowed = False
+                return RESYNC
+            batch, self._pending = list(self._pending.values()), OrderedDict()
+        return batch
+
+
+class ChangeBus:
+    def __init__(self, backend: str, channel: str):
+        self.backend = backend
+        self.channel = channel
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def stage(self, db: Session, change: Dict[str, Any]) -> None:
+        """Queue an event on the session's transaction; it is delivered only if that transaction commits"""
+        if self.backend == "postgres":
+            db.execute(select(func.pg_notify(self.channel, json.dumps([change]))))
+        else:
+            db.info.setdefault("change_events", []).append(change)
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.offer(events)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), settings.event_client_buffer)
+        with self._lock:
+            self._subscriptions.append(subscription)
+            if self.backend == "postgres" and self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="change-listener", daemon=True)
+                self._listener.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    async def stream(self, subscription: Subscription) -> AsyncIterator[Optional[Any]]:
+        """Batches for one subscriber; None when a heartbeat is due"""
+        while True:
+            yield await subscription.next_batch(
+                settings.event_coalesce_ms / 1000,
+                settings.event_heartbeat_seconds
+            )
+
+    def _listen(self) -> None:
+        """LISTEN on a dedicated connection and fan notifications out to local subscribers"""
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(settings.database_url)
+                connection.set_session(autocommit=True)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                while True:
+                    if select_module.select([connection], [], [], 5) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.publish(json.loads(connection.notifies.pop(0).payload))
+            except Exception as e:
+                print(f"Warning: change listener lost its connection, reconnecting: {e}")
+                if connection is not None:
+                    connection.close()
+                # Clients missed whatever was sent meanwhile; have them resync
+                with self._lock:
+                    subscriptions = list(self._subscriptions)
+                for subscription in subscriptions:
+                    subscription.offer_resync()
+                threading.Event().wait(1)
+
+
+change_bus = ChangeBus(settings.event_backend, settings.event_channel)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    events = session.info.pop("change_events", None)
+    if events:
+        change_bus.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("change_events", None)
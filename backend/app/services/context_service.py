@@ -0,0 +1,103 @@
+from typing import List, Dict, Any, Optional
+from app.services.database import DatabaseService
+from app.models.models import ObjectType
+from app.utils.tokens import estimate_tokens
+import json
+import re
+import uuid
+
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "what", "which", "who", "how", "are", "is",
+    "was", "were", "can", "could", "would", "should", "about", "from", "into", "have", "has",
+    "does", "did", "any", "all", "there", "their", "them", "they", "you", "your", "our",
+    "show", "tell", "list", "give", "find", "please", "object", "objects",
+}
+
+MAX_DESCRIPTION_CHARS = 300
+
+
+class ContextBuilder:
+    """Builds a compact, token-budgeted catalog excerpt relevant to a chat message"""
+
+    def __init__(self, token_budget: int, max_objects: int):
+        self.token_budget = token_budget
+        self.max_objects = max_objects
+
+    def build(self, message: str, db_service: DatabaseService) -> str:
+        matches = db_service.search_objects_by_terms(self.extract_terms(message), self.max_objects)
+        if not matches:
+            return ""
+
+        match_ids = [obj.id for obj in matches]
+        relations = db_service.get_relations_for_objects(match_ids)
+        hierarchies = db_service.get_hierarchies_for_objects(match_ids)
+
+        # Resolve names for the one-hop neighbours in a single query
+        names = {obj.id: obj for obj in matches}
+        neighbour_ids = set()
+        for relation in relations:
+            neighbour_ids.add(relation.primary_object_id)
+            neighbour_ids.update(self._to_uuid(obj_id) for obj_id in relation.secondary_object_ids or [])
+        for hierarchy in hierarchies:
+            neighbour_ids.add(hierarchy.parent_object_id)
+            neighbour_ids.update(self._to_uuid(obj_id) for obj_id in hierarchy.child_object_ids or [])
+        neighbour_ids = {obj_id for obj_id in neighbour_ids if obj_id and obj_id not in names}
+        neighbours = db_service.get_objects_by_ids(list(neighbour_ids))
+        names.update({obj.id: obj for obj in neighbours})
+
+        def name_of(obj_id: Any) -> str:
+            obj = names.get(self._to_uuid(obj_id))
+            return obj.name if obj else "Unknown"
+
+        # Highest-value entries first; whatever doesn't fit the budget is dropped
+        entries = [self._object_entry(obj) for obj in matches]
+        entries += [{
+            "relation": relation.relation_type,
+            "primary": name_of(relation.primary_object_id),
+            "secondary": [name_of(obj_id) for obj_id in relation.secondary_object_ids or []],
+        } for relation in relations]
+        entries += [{
+            "parent": name_of(hierarchy.parent_object_id),
+            "children": [name_of(obj_id) for obj_id in hierarchy.child_object_ids or []],
+        } for hierarchy in hierarchies]
+        entries += [{"id": str(obj.id), "name": obj.name, "type": obj.type} for obj in neighbours]
+
+        lines = []
+        used_tokens = 0
+        for entry in entries:
+            line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False, default=str)
+            line_tokens = estimate_tokens(line) + 1
+            if used_tokens + line_tokens > self.token_budget:
+                break
+            lines.append(line)
+            used_tokens += line_tokens
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def extract_terms(message: str) -> List[str]:
+        terms = []
+        for word in re.findall(r"[\w-]{3,}", message.lower()):
+            if word not in STOPWORDS and word not in terms:
+                terms.append(word)
+        return terms[:12]
+
+    @staticmethod
+    def _object_entry(obj: ObjectType) -> Dict[str, Any]:
+        description = obj.description or ""
+        if len(description) > MAX_DESCRIPTION_CHARS:
+            description = description[:MAX_DESCRIPTION_CHARS] + "…"
+        entry = {"id": str(obj.id), "name": obj.name, "type": obj.type, "description": description}
+        if obj.attributes:
+            entry["attributes"] = obj.attributes
+        return entry
+
+    @staticmethod
+    def _to_uuid(value: Any) -> Optional[uuid.UUID]:
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            return None
@@ -1,19 +1,160 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.models import ObjectType, Relation, Hierarchy, User, Types, RelationType, HierarchyType
+from sqlalchemy.orm import Session, undefer, selectinload
+from sqlalchemy import or_, cast, func, select, union, update, delete, exists, text, true, false, literal, tuple_, Table, Text
+from sqlalchemy.sql.elements import ColumnElement, ClauseElement
+from sqlalchemy.sql.expression import Executable, Select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.engine import Row
+from sqlalchemy.dialects.postgresql import JSONB, UUID, array, insert
+from typing import List, Optional, Dict, Any, Iterator, BinaryIO, Tuple
+from app.models.models import (
+    ObjectType, Relation, Hierarchy, User, Types, RelationType, HierarchyType,
+    ChatSession, ChatMessage, CatalogCounter, ChangeLog, ObjectTable, ObjectTableRow, relation_secondary_objects,
+    object_search_document
+)
 from app.schemas.schemas import (
     ObjectCreate, ObjectUpdate, RelationCreate, RelationUpdate,
-    HierarchyCreate, HierarchyUpdate, ChatSessionCreate, TypesCreate, TypesUpdate,
+    HierarchyCreate, HierarchyUpdate, ChatSessionCreate, ChatMessageCreate, TypesCreate, TypesUpdate,
     RelationTypeBase, RelationTypeCreate, RelationTypeBase, RelationTypeUpdate,
     HierarchyTypeBase, HierarchyTypeCreate, HierarchyTypeUpdate
 )
+from app.core.config import settings
+from app.utils.columnar import encode_table, ColumnarTable
+from app.services.change_events import change_bus
+from app.services.object_loader import ObjectLoader
+from contextlib import contextmanager
 import uuid
 from datetime import datetime
 
 
+class Explain(Executable, ClauseElement):
+    """EXPLAIN for any statement, with its parameters bound as usual"""
+    inherit_cache = False
+
+    def __init__(self, statement: Executable):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN {compiler.process(element.statement, **kw)}"
+
+
+# Rows per round trip when streaming through a server-side cursor
+STREAM_FETCH_SIZE = 2000
+# Associations GET /objects can embed with expand=
+OBJECT_EXPANSIONS = ("relations", "secondaries", "hierarchy", "type")
+# Id list entries that are not UUIDs can't name an object and count as dangling
+UUID_PATTERN = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+
+
 class DatabaseService:
     def __init__(self, db: Session):
         self.db = db
+        # Objects fetched during this request, shared by every lookup below
+        self.objects = ObjectLoader(db)
+        # Set while batch() holds the transaction open
+        self.in_batch = False
+
+    def _commit(self) -> None:
+        """Commit an entity write, or only flush it inside batch()"""
+        if self.in_batch:
+            self.db.flush()
+        else:
+            self.db.commit()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Run several entity writes as one transaction with a single commit; any error rolls all of them back"""
+        self.in_batch = True
+        try:
+            yield
+            self.in_batch = False
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.in_batch = False
+
+    # Catalog version methods
+    def _bump_counter(self, name: str) -> None:
+        """Count a write in the same transaction, so cached reports see every change"""
+        self.db.execute(
+            insert(CatalogCounter)
+            .values(name=name, value=1)
+            .on_conflict_do_update(index_elements=[CatalogCounter.name], set_={"value": CatalogCounter.value + 1})
+        )
+
+    def bump_catalog_counters(self, names: List[str]) -> None:
+        """Count a bulk write made outside the entity methods; the caller commits"""
+        for name in names:
+            self._bump_counter(name)
+
+    def get_catalog_versions(self) -> Dict[str, Any]:
+        """Write counters per entity plus the latest object modification time"""
+        versions = {name: value for name, value in self.db.query(CatalogCounter.name, CatalogCounter.value).all()}
+        # Catches object edits made outside DatabaseService
+        objects_modified = self.db.query(func.max(ObjectType.modified_date)).scalar()
+        versions["objects_modified"] = objects_modified.isoformat() if objects_modified else ""
+        return versions
+
+    # Change log methods
+    def _record_change(self, row: Any, deleted: bool = False) -> None:
+        """Log a write to an object, relation or hierarchy in the same transaction, for the delta feed
+        and the change event subscribers"""
+        if row.id is None:
+            self.db.flush()
+        self._upsert_changes(insert(ChangeLog).values(
+            entity=row.__tablename__, entity_id=row.id, txid=func.txid_current(), deleted=deleted
+        ))
+        change_bus.stage(self.db, {
+            "entity": row.__tablename__,
+            "id": str(row.id),
+            "revision": getattr(row, "revision", None),
+            "deleted": deleted
+        })
+
+    def _record_changed_ids(self, entity: str, ids: List[uuid.UUID], deleted: bool = False) -> None:
+        """Log rows written by set-based statements; the caller commits"""
+        if not ids:
+            return
+        self._upsert_changes(insert(ChangeLog).values([
+            {"entity": entity, "entity_id": entity_id, "txid": func.txid_current(), "deleted": deleted}
+            for entity_id in ids
+        ]))
+        for entity_id in ids:
+            change_bus.stage(self.db, {"entity": entity, "id": str(entity_id), "revision": None, "deleted": deleted})
+
+    def record_changes(self, entity: str, id_query: Select) -> None:
+        """Log every id the query returns as changed by a bulk write; the caller commits"""
+        ids = id_query.subquery()
+        # Distinct, as ON CONFLICT cannot touch the same row twice in one statement
+        self._upsert_changes(insert(ChangeLog).from_select(
+            ["entity", "entity_id", "txid", "deleted"],
+            select(literal(entity), list(ids.c)[0], func.txid_current(), false()).distinct()
+        ))
+        # One event without an id: too many rows to list, subscribers read them from the feed
+        change_bus.stage(self.db, {"entity": entity, "id": None, "revision": None, "deleted": False})
+
+    def _upsert_changes(self, statement: Any) -> None:
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[ChangeLog.entity, ChangeLog.entity_id],
+            set_={"txid": statement.excluded.txid, "deleted": statement.excluded.deleted, "changed_date": func.now()}
+        ))
+
+    def get_changes(self, after: Tuple[int, int], limit: int) -> Tuple[List[ChangeLog], Tuple[int, int], bool]:
+        """Changes past a (txid, seq) position, the position to resume from and whether more are ready"""
+        # Every transaction below the snapshot's xmin has finished, so none can still
+        # add a change behind the returned position
+        horizon = self.db.execute(select(func.txid_snapshot_xmin(func.txid_current_snapshot()))).scalar()
+        changes = self.db.query(ChangeLog).filter(
+            tuple_(ChangeLog.txid, ChangeLog.seq) > tuple_(*after),
+            ChangeLog.txid < horizon
+        ).order_by(ChangeLog.txid, ChangeLog.seq).limit(limit + 1).all()
+        if len(changes) > limit:
+            last = changes[limit - 1]
+            return changes[:limit], (last.txid, last.seq), True
+        return changes, max(after, (horizon, 0)), False
 
     # ObjectType methods
     def get_object_types(self) -> Optional[Types]:
@@ -25,7 +166,8 @@ class DatabaseService:
     def create_object_type(self, object_type_data: TypesCreate) -> Types:
         db_object_type = Types(**object_type_data.model_dump())
         self.db.add(db_object_type)
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         self.db.refresh(db_object_type)
         return db_object_type
     
@@ -41,7 +183,8 @@ class DatabaseService:
         # db_object_type.revision += 1
         # db_object_type.modified_date = datetime.utcnow()
         
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         self.db.refresh(db_object_type)
         return db_object_type
     
@@ -54,21 +197,129 @@ class DatabaseService:
             return False
         
         self.db.delete(db_object_type)
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         return True
 
     # Object methods
-    def get_objects(self) -> List[ObjectType]:
-        return self.db.query(ObjectType).all()
+    def get_objects(self, conditions: Optional[List[ColumnElement]] = None) -> List[ObjectType]:
+        """All objects, or those matching conditions from parse_object_filter"""
+        return self.db.query(ObjectType).filter(*(conditions or [])).all()
+
+    def expand_objects(self, objects: List[ObjectType], expand: List[str]) -> List[Dict[str, Any]]:
+        """The requested OBJECT_EXPANSIONS per object, each loaded for all the objects in one query.
+        'secondaries' fills secondary_objects on the relations and implies 'relations'"""
+        expansions = [{} for _ in objects]
+        object_ids = [obj.id for obj in objects]
+        
+        if "relations" in expand or "secondaries" in expand:
+            query = self.db.query(Relation).filter(Relation.primary_object_id.in_(object_ids)).order_by(Relation.id)
+            if "secondaries" in expand:
+                # Summaries only; their tables are left unloaded
+                query = query.options(selectinload(Relation.secondary_objects).lazyload(ObjectType.tables))
+            relations = {}
+            for relation in query.all():
+                relations.setdefault(relation.primary_object_id, []).append(relation)
+            for obj, expansion in zip(objects, expansions):
+                expansion["relations"] = relations.get(obj.id, [])
+        
+        if "hierarchy" in expand:
+            hierarchies = {}
+            for hierarchy in self.db.query(Hierarchy).filter(Hierarchy.parent_object_id.in_(object_ids)).all():
+                hierarchies.setdefault(hierarchy.parent_object_id, []).append(hierarchy)
+            for obj, expansion in zip(objects, expansions):
+                expansion["hierarchy"] = hierarchies.get(obj.id, [])
+        
+        if "type" in expand:
+            # ObjectType.type names a Types row; hierarchy types are keyed by that row's id
+            types = {t.object_type: t for t in self.db.query(Types).filter(Types.object_type.in_({obj.type for obj in objects})).all()}
+            hierarchy_types = {
+                h.object_type: h
+                for h in self.db.query(HierarchyType).filter(HierarchyType.object_type.in_([t.id for t in types.values()])).all()
+            }
+            for obj, expansion in zip(objects, expansions):
+                object_type = types.get(obj.type)
+                expansion["object_type"] = object_type
+                expansion["hierarchy_type"] = hierarchy_types.get(object_type.id) if object_type else None
+        
+        return expansions
+
+    def get_object_facets(self, conditions: List[ColumnElement], attribute_keys: List[str], value_limit: int) -> Dict[str, Any]:
+        """Object counts per type, per defined object type and per value of each attribute key"""
+        total = self.db.query(func.count(ObjectType.id)).filter(*conditions).scalar()
+        type_counts = dict(
+            self.db.query(ObjectType.type, func.count(ObjectType.id))
+            .filter(*conditions)
+            .group_by(ObjectType.type)
+            .all()
+        )
+        object_types = [
+            {"id": t.id, "object_type": t.object_type, "parid": t.parid, "count": type_counts.get(t.object_type, 0)}
+            for t in self.db.query(Types).order_by(Types.id).all()
+        ]
+
+        attributes = {key: {} for key in attribute_keys}
+        if attribute_keys:
+            # One pass over the matching objects for all keys; ?| lets the GIN index pick them
+            pairs = func.jsonb_each_text(ObjectType.attributes).table_valued("key", "value").alias("kv")
+            count = func.count()
+            rows = self.db.execute(
+                select(pairs.c.key, pairs.c.value, count)
+                .select_from(ObjectType)
+                .join(pairs, true())
+                .where(*conditions, ObjectType.attributes.has_any(array(attribute_keys)), pairs.c.key.in_(attribute_keys))
+                .group_by(pairs.c.key, pairs.c.value)
+                .order_by(count.desc())
+            )
+            for key, value, value_count in rows:
+                if len(attributes[key]) < value_limit:
+                    attributes[key][value] = value_count
+
+        return {"total": total, "types": type_counts, "object_types": object_types, "attributes": attributes}
+
+    def explain_objects_query(self, conditions: List[ColumnElement]) -> List[str]:
+        """Plan for an object filter with sequential scans disabled, so it shows whether an index can serve it"""
+        try:
+            self.db.execute(text("SET LOCAL enable_seqscan = off"))
+            return [line for line, in self.db.execute(Explain(select(ObjectType.id).where(*conditions)))]
+        finally:
+            self.db.rollback()
 
     def get_object(self, object_id: uuid.UUID) -> Optional[ObjectType]:
-        return self.db.query(ObjectType).filter(ObjectType.id == object_id).first()
+        return self.objects.get(object_id)
+
+    def get_objects_by_ids(self, object_ids: List[uuid.UUID]) -> List[ObjectType]:
+        return [obj for obj in self.objects.get_many(dict.fromkeys(object_ids)) if obj is not None]
+
+    def search_objects_by_terms(self, terms: List[str], limit: int) -> List[ObjectType]:
+        """Objects whose name or description has a word starting with any term, best matches first"""
+        terms = [term.replace('-', '') for term in terms]
+        return [obj for obj, rank in self.rank_objects_fulltext([term for term in terms if term], limit, prefix=True)]
+
+    def rank_objects_fulltext(self, terms: List[str], limit: int, prefix: bool = False) -> List[tuple]:
+        """(object, rank) pairs from Postgres full-text search, best first, ties broken by name then id"""
+        if not terms:
+            return []
+        
+        # Served by the ix_objects_search_document expression index
+        document = object_search_document
+        query = func.to_tsquery('simple', ' | '.join(f"{term}:*" if prefix else term for term in terms))
+        rank = func.ts_rank(document, query)
+        return self.db.query(ObjectType, rank).filter(
+            document.op('@@')(query)
+        ).order_by(rank.desc(), ObjectType.name, ObjectType.id).limit(limit).all()
 
     def create_object(self, object_data: ObjectCreate) -> ObjectType:
-        db_object = ObjectType(**object_data.model_dump())
+        object_dict = object_data.model_dump()
+        tables = object_dict.pop("tables")
+        db_object = ObjectType(**object_dict)
         self.db.add(db_object)
-        self.db.commit()
+        self._set_object_tables(db_object, tables)
+        self._bump_counter("objects")
+        self._record_change(db_object)
+        self._commit()
         self.db.refresh(db_object)
+        self.objects.prime(db_object)
         return db_object
 
     def update_object(self, object_id: uuid.UUID, object_data: ObjectUpdate) -> Optional[ObjectType]:
@@ -77,24 +328,184 @@ class DatabaseService:
             return None
         
         update_data = object_data.model_dump(exclude_unset=True)
+        tables = update_data.pop("tables", None)
         for field, value in update_data.items():
             setattr(db_object, field, value)
+        if tables is not None:
+            self._set_object_tables(db_object, tables)
         
         db_object.revision += 1
         db_object.modified_date = datetime.utcnow()
         
-        self.db.commit()
+        self._bump_counter("objects")
+        self._record_change(db_object)
+        self._commit()
         self.db.refresh(db_object)
         return db_object
 
+    def _set_object_tables(self, db_object: ObjectType, tables: List[Dict[str, Any]]) -> None:
+        """Replace an object's table definitions; rows are only rewritten for tables that carry data"""
+        existing = {table.name: table for table in db_object.tables}
+        new_rows = []
+        db_tables = []
+        for position, table_data in enumerate(tables):
+            db_table = existing.get(table_data["name"]) or ObjectTable(id=uuid.uuid4(), name=table_data["name"])
+            db_table.position = position
+            db_table.columns = table_data["columns"]
+            if table_data.get("data") is not None:
+                db_table.row_count = len(table_data["data"])
+                new_rows.append((db_table, table_data["data"]))
+            db_tables.append(db_table)
+        db_object.tables = db_tables
+        self.db.flush()
+
+        for db_table, rows in new_rows:
+            self.db.query(ObjectTableRow).filter(ObjectTableRow.table_id == db_table.id).delete(synchronize_session=False)
+            if settings.table_storage_encoding == "columnar":
+                db_table.encoded_data = encode_table(rows, db_table.columns or [])
+                continue
+            db_table.encoded_data = None
+            if rows:
+                self.db.execute(insert(ObjectTableRow), [
+                    {"table_id": db_table.id, "row_index": index, "cells": cells} for index, cells in enumerate(rows)
+                ])
+
+    def get_object_table(self, object_id: uuid.UUID, name: str) -> Optional[ObjectTable]:
+        return self.db.query(ObjectTable).options(undefer(ObjectTable.encoded_data)).filter(
+            ObjectTable.object_id == object_id,
+            ObjectTable.name == name
+        ).first()
+
+    def get_object_table_rows(self, table: ObjectTable, offset: int, limit: int, columns: Optional[List[str]] = None) -> List[List[Any]]:
+        """Rows [offset, offset + limit), keeping only the named columns (all of table.columns by
+        default, so cells past the declared columns are dropped); raises ValueError for unknown names"""
+        if columns is None:
+            columns = list(range(len(table.columns or [])))
+        else:
+            columns = [list(table.columns or []).index(name) for name in columns]
+        if table.encoded_data is not None:
+            return ColumnarTable(table.encoded_data).read(offset, limit, columns)
+
+        # Row indexes are dense, so a page is a key range rather than an OFFSET scan
+        rows = [cells for cells, in self.db.query(ObjectTableRow.cells).filter(
+            ObjectTableRow.table_id == table.id,
+            ObjectTableRow.row_index >= offset,
+            ObjectTableRow.row_index < offset + limit
+        ).order_by(ObjectTableRow.row_index).all()]
+        return [[row[index] if index < len(row) else None for index in columns] for row in rows]
+
     def delete_object(self, object_id: uuid.UUID) -> bool:
+        """Delete an object and every reference to it in one transaction: relations and
+        hierarchies it heads are deleted, id lists naming it drop the id"""
         db_object = self.get_object(object_id)
         if not db_object:
             return False
         
-        self.db.delete(db_object)
-        self.db.commit()
+        deleted_relations = self._delete_relations(Relation.primary_object_id == object_id)
+        changed_relations = self._remove_listed_object(Relation.secondary_object_ids, object_id, Relation.id.in_(
+            select(relation_secondary_objects.c.relation_id).where(relation_secondary_objects.c.object_id == object_id)
+        ))
+        self.db.execute(delete(relation_secondary_objects).where(relation_secondary_objects.c.object_id == object_id))
+        deleted_hierarchies = self._delete_hierarchies(Hierarchy.parent_object_id == object_id)
+        changed_hierarchies = self._remove_listed_object(
+            Hierarchy.child_object_ids, object_id, cast(Hierarchy.child_object_ids, JSONB).op('?')(str(object_id))
+        )
+        # Tables and their rows go with the object through ON DELETE CASCADE
+        self.db.execute(delete(ObjectType).where(ObjectType.id == object_id).execution_options(synchronize_session=False))
+        
+        self._bump_counter("objects")
+        self._record_change(db_object, deleted=True)
+        self.objects.forget(object_id)
+        if deleted_relations or changed_relations:
+            self._bump_counter("relations")
+            self._record_changed_ids("relations", deleted_relations, deleted=True)
+            self._record_changed_ids("relations", changed_relations)
+        if deleted_hierarchies or changed_hierarchies:
+            self._bump_counter("hierarchies")
+            self._record_changed_ids("hierarchies", deleted_hierarchies, deleted=True)
+            self._record_changed_ids("hierarchies", changed_hierarchies)
+        self._commit()
         return True
+
+    def _delete_relations(self, condition: ColumnElement) -> List[uuid.UUID]:
+        self.db.execute(delete(relation_secondary_objects).where(
+            relation_secondary_objects.c.relation_id.in_(select(Relation.id).where(condition))
+        ))
+        return self.db.execute(
+            delete(Relation).where(condition).returning(Relation.id).execution_options(synchronize_session=False)
+        ).scalars().all()
+
+    def _delete_hierarchies(self, condition: ColumnElement) -> List[uuid.UUID]:
+        return self.db.execute(
+            delete(Hierarchy).where(condition).returning(Hierarchy.id).execution_options(synchronize_session=False)
+        ).scalars().all()
+
+    def _remove_listed_object(self, column: Any, object_id: uuid.UUID, condition: ColumnElement) -> List[uuid.UUID]:
+        """Drop an object id from a JSON id list column in every row matching the condition"""
+        model = column.class_
+        return self.db.execute(
+            update(model)
+            .where(condition)
+            .values({column: cast(column, JSONB).op('-', return_type=JSONB)(str(object_id))})
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+    def repair_dangling_references(self, entity: str, after: Optional[uuid.UUID], batch_size: int) -> Tuple[Optional[uuid.UUID], int]:
+        """Repair the next batch of relations or hierarchies (ordered by id, after the given one)
+        that point at missing objects, as delete_object would have; returns the last id checked,
+        None past the end, and how many rows were repaired"""
+        model = {"relations": Relation, "hierarchies": Hierarchy}[entity]
+        query = self.db.query(model.id).order_by(model.id).limit(batch_size)
+        if after is not None:
+            query = query.filter(model.id > after)
+        batch = [row_id for row_id, in query.all()]
+        if not batch:
+            return None, 0
+        
+        if model is Relation:
+            deleted = self._delete_relations(
+                Relation.id.in_(batch) & ~exists().where(ObjectType.id == Relation.primary_object_id)
+            )
+            changed = self._drop_missing_listed_objects(Relation.secondary_object_ids, batch)
+        else:
+            deleted = self._delete_hierarchies(
+                Hierarchy.id.in_(batch)
+                & Hierarchy.parent_object_id.isnot(None)
+                & ~exists().where(ObjectType.id == Hierarchy.parent_object_id)
+            )
+            changed = self._drop_missing_listed_objects(Hierarchy.child_object_ids, batch)
+        
+        if deleted or changed:
+            self._bump_counter(entity)
+            self._record_changed_ids(entity, deleted, deleted=True)
+            self._record_changed_ids(entity, changed)
+        self.db.commit()
+        return batch[-1], len(deleted) + len(changed)
+
+    def _drop_missing_listed_objects(self, column: Any, row_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        """Remove ids of objects that no longer exist from a JSON id list column, keeping the order"""
+        table, name = column.class_.__tablename__, column.key
+        statement = text(f"""
+            UPDATE {table} SET {name} = cleaned.ids
+            FROM (
+                SELECT s.id, coalesce(jsonb_agg(e.value ORDER BY e.position) FILTER (WHERE o.id IS NOT NULL), '[]'::jsonb) AS ids
+                FROM {table} s
+                CROSS JOIN LATERAL jsonb_array_elements_text(
+                    CASE WHEN jsonb_typeof(s.{name}::jsonb) = 'array' THEN s.{name}::jsonb ELSE '[]'::jsonb END
+                ) WITH ORDINALITY e(value, position)
+                LEFT JOIN objects o ON o.id = CASE WHEN e.value ~* :uuid_pattern THEN e.value::uuid END
+                WHERE s.id = ANY(CAST(:row_ids AS uuid[]))
+                GROUP BY s.id
+                HAVING bool_or(o.id IS NULL)
+            ) cleaned
+            WHERE {table}.id = cleaned.id
+            RETURNING {table}.id
+        """).columns(id=UUID(as_uuid=True))
+        return self.db.execute(statement, {
+            "uuid_pattern": UUID_PATTERN,
+            "row_ids": [str(row_id) for row_id in row_ids]
+        }).scalars().all()
     
     # RelationType methods
     def get_relation_types(self) -> Optional[RelationType]:
@@ -106,7 +517,8 @@ class DatabaseService:
     def create_relation_type(self, relation_type_data: RelationTypeCreate) -> RelationType:
         db_relation_type = RelationType(**relation_type_data.model_dump())
         self.db.add(db_relation_type)
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         self.db.refresh(db_relation_type)
         return db_relation_type
     
@@ -119,7 +531,8 @@ class DatabaseService:
         for key, value in update_data.items():
             setattr(db_relation_type, key, value)
 
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         self.db.refresh(db_relation_type)
         return db_relation_type
     
@@ -129,18 +542,63 @@ class DatabaseService:
             return None
 
         self.db.delete(db_relation_type)
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         return db_relation_type
 
     # Relation methods
     def get_relations(self) -> List[Relation]:
         return self.db.query(Relation).all()
 
+    def get_relations_by_ids(self, relation_ids: List[uuid.UUID]) -> List[Relation]:
+        if not relation_ids:
+            return []
+        return self.db.query(Relation).filter(Relation.id.in_(relation_ids)).all()
+
     def get_object_relations(self, object_id: uuid.UUID) -> List[Relation]:
         return self.db.query(Relation).filter(
             (Relation.primary_object_id == object_id)
         ).all()
 
+    def get_relations_for_objects(self, object_ids: List[uuid.UUID]) -> List[Relation]:
+        """Relations that touch any of the objects as primary or secondary"""
+        if not object_ids:
+            return []
+        # A union of two index lookups; OR-ing the IN subquery into the filter plans a scan of relations
+        relation_ids = union(
+            select(Relation.id).where(Relation.primary_object_id.in_(object_ids)),
+            select(relation_secondary_objects.c.relation_id).where(relation_secondary_objects.c.object_id.in_(object_ids))
+        )
+        return self.db.query(Relation).filter(Relation.id.in_(relation_ids)).all()
+
+    def get_object_usage(self, object_id: uuid.UUID, offset: int, limit: int) -> Dict[str, Any]:
+        """Relations naming the object as a secondary and hierarchies listing it as a child:
+        totals, relation counts per type and a page of each"""
+        relation_ids = select(relation_secondary_objects.c.relation_id).where(
+            relation_secondary_objects.c.object_id == object_id
+        )
+        relation_counts = dict(
+            self.db.query(Relation.relation_type, func.count(Relation.id))
+            .filter(Relation.id.in_(relation_ids))
+            .group_by(Relation.relation_type)
+            .all()
+        )
+        relations = self.db.query(Relation).filter(
+            Relation.id.in_(relation_ids)
+        ).order_by(Relation.id).offset(offset).limit(limit).all()
+
+        child_of = cast(Hierarchy.child_object_ids, JSONB).op('?')(str(object_id))
+        hierarchy_total = self.db.query(func.count(Hierarchy.id)).filter(child_of).scalar()
+        hierarchies = self.db.query(Hierarchy).filter(child_of).order_by(Hierarchy.id).offset(offset).limit(limit).all()
+
+        return {
+            "relation_total": sum(relation_counts.values()),
+            "relation_counts": relation_counts,
+            "relations": relations,
+            "hierarchy_total": hierarchy_total,
+            "hierarchies": hierarchies
+        }
+
     def create_relation(self, relation_data: RelationCreate) -> Relation:
         data = relation_data.model_dump()
         
@@ -153,15 +611,16 @@ class DatabaseService:
         
         # Set up many-to-many relationships
         if secondary_object_ids:
-            for obj_id in secondary_object_ids:
-                obj = self.get_object(obj_id)
-                if obj:
-                    db_relation.secondary_objects.append(obj)
+            db_relation.secondary_objects.extend(
+                obj for obj in self.objects.get_many(dict.fromkeys(secondary_object_ids)) if obj
+            )
             
             # Also update the JSON field for backward compatibility
             db_relation.secondary_object_ids = [str(obj_id) for obj_id in secondary_object_ids]
         
-        self.db.commit()
+        self._bump_counter("relations")
+        self._record_change(db_relation)
+        self._commit()
         self.db.refresh(db_relation)
         return db_relation
 
@@ -185,15 +644,16 @@ class DatabaseService:
             # Add new relationships
             secondary_object_ids = update_data['secondary_object_ids']
             if secondary_object_ids:
-                for obj_id in secondary_object_ids:
-                    obj = self.get_object(obj_id)
-                    if obj:
-                        db_relation.secondary_objects.append(obj)
+                db_relation.secondary_objects.extend(
+                    obj for obj in self.objects.get_many(dict.fromkeys(secondary_object_ids)) if obj
+                )
             
             # Also update the JSON field for backward compatibility
             db_relation.secondary_object_ids = [str(obj_id) for obj_id in secondary_object_ids]
         
-        self.db.commit()
+        self._bump_counter("relations")
+        self._record_change(db_relation)
+        self._commit()
         self.db.refresh(db_relation)
         return db_relation
 
@@ -203,7 +663,9 @@ class DatabaseService:
             return False
         
         self.db.delete(db_relation)
-        self.db.commit()
+        self._bump_counter("relations")
+        self._record_change(db_relation, deleted=True)
+        self._commit()
         return True
     
     # HerearchyType methods
@@ -217,7 +679,8 @@ class DatabaseService:
     def create_hierarchy_type(self, hierarchy_data: HierarchyTypeCreate) -> HierarchyType:
         db_hierarchy = HierarchyType(**hierarchy_data.dict())
         self.db.add(db_hierarchy)
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         self.db.refresh(db_hierarchy)
         return db_hierarchy
 
@@ -233,7 +696,8 @@ class DatabaseService:
         for key, value in update_data.items():
             setattr(db_hierarchy, key, value)
 
-        self.db.commit()
+        self._bump_counter("types")
+        self._commit()
         self.db.refresh(db_hierarchy)
         return db_hierarchy
 
@@ -242,11 +706,28 @@ class DatabaseService:
     def get_hierarchies(self) -> List[Hierarchy]:
         return self.db.query(Hierarchy).all()
 
+    def get_hierarchies_by_ids(self, hierarchy_ids: List[uuid.UUID]) -> List[Hierarchy]:
+        if not hierarchy_ids:
+            return []
+        return self.db.query(Hierarchy).filter(Hierarchy.id.in_(hierarchy_ids)).all()
+
     def get_object_hierarchy(self, object_id: uuid.UUID) -> List[Hierarchy]:
         return self.db.query(Hierarchy).filter(
             (Hierarchy.parent_object_id == object_id)
         ).all()
 
+    def get_hierarchies_for_objects(self, object_ids: List[uuid.UUID]) -> List[Hierarchy]:
+        """Hierarchies where any of the objects is the parent or one of the children"""
+        if not object_ids:
+            return []
+        child_ids = array([str(object_id) for object_id in object_ids])
+        return self.db.query(Hierarchy).filter(
+            or_(
+                Hierarchy.parent_object_id.in_(object_ids),
+                cast(Hierarchy.child_object_ids, JSONB).op('?|')(child_ids)
+            )
+        ).all()
+
     def create_hierarchy(self, hierarchy_data: HierarchyCreate) -> Hierarchy:
         data = hierarchy_data.model_dump()
 
@@ -256,7 +737,9 @@ class DatabaseService:
 
         db_hierarchy = Hierarchy(**data)
         self.db.add(db_hierarchy)
-        self.db.commit()
+        self._bump_counter("hierarchies")
+        self._record_change(db_hierarchy)
+        self._commit()
         self.db.refresh(db_hierarchy)
         return db_hierarchy
 
@@ -269,7 +752,9 @@ class DatabaseService:
         for field, value in update_data.items():
             setattr(db_hierarchy, field, value)
         
-        self.db.commit()
+        self._bump_counter("hierarchies")
+        self._record_change(db_hierarchy)
+        self._commit()
         self.db.refresh(db_hierarchy)
         return db_hierarchy
 
@@ -279,9 +764,126 @@ class DatabaseService:
             return False
         
         self.db.delete(db_hierarchy)
-        self.db.commit()
+        self._bump_counter("hierarchies")
+        self._record_change(db_hierarchy, deleted=True)
+        self._commit()
         return True
 
+    # Chat session methods
+    def get_chat_session(self, session_id: uuid.UUID) -> Optional[ChatSession]:
+        return self.db.query(ChatSession).filter(ChatSession.id == session_id).first()
+
+    def create_chat_session(self, session_data: ChatSessionCreate) -> ChatSession:
+        db_session = ChatSession(**session_data.model_dump())
+        self.db.add(db_session)
+        self.db.commit()
+        self.db.refresh(db_session)
+        return db_session
+
+    def get_chat_messages(self, session_id: uuid.UUID, after_seq: int = 0) -> List[ChatMessage]:
+        return self.db.query(ChatMessage).filter(
+            ChatMessage.session_id == session_id,
+            ChatMessage.seq > after_seq
+        ).order_by(ChatMessage.seq).all()
+
+    def append_chat_messages(self, session_id: uuid.UUID, messages: List[ChatMessageCreate]) -> List[ChatMessage]:
+        # Lock the session row so concurrent turns get distinct sequence numbers
+        db_session = self.db.query(ChatSession).filter(ChatSession.id == session_id).with_for_update().first()
+        if not db_session:
+            return []
+        
+        db_messages = []
+        for message in messages:
+            db_session.message_count = (db_session.message_count or 0) + 1
+            db_message = ChatMessage(session_id=session_id, seq=db_session.message_count, **message.model_dump())
+            self.db.add(db_message)
+            db_messages.append(db_message)
+        
+        self.db.commit()
+        return db_messages
+
+    def update_chat_session_summary(self, session_id: uuid.UUID, summary: str, summarized_seq: int) -> Optional[ChatSession]:
+        db_session = self.get_chat_session(session_id)
+        if not db_session:
+            return None
+        
+        db_session.summary = summary
+        db_session.summarized_seq = summarized_seq
+        
+        self.db.commit()
+        self.db.refresh(db_session)
+        return db_session
+
+    # Report projections: only the columns reports render, streamed through a server-side cursor
+    def count_objects(self) -> int:
+        return self.db.query(func.count(ObjectType.id)).scalar()
+
+    def iter_report_objects(self) -> Iterator[Row]:
+        table_names = func.array(
+            select(ObjectTable.name)
+            .where(ObjectTable.object_id == ObjectType.id)
+            .order_by(ObjectTable.position)
+            .scalar_subquery()
+        ).label('table_names')
+        return self.db.execute(
+            select(ObjectType.id, ObjectType.name, ObjectType.type, ObjectType.description,
+                   ObjectType.attributes, table_names)
+            .execution_options(yield_per=STREAM_FETCH_SIZE)
+        )
+
+    def iter_object_summaries(self, with_description: bool = False) -> Iterator[Row]:
+        columns = [ObjectType.id, ObjectType.name, ObjectType.type]
+        if with_description:
+            columns.append(ObjectType.description)
+        return self.db.execute(select(*columns).execution_options(yield_per=STREAM_FETCH_SIZE))
+
+    def iter_relation_rows(self) -> Iterator[Row]:
+        return self.db.execute(
+            select(Relation.primary_object_id, Relation.relation_type, Relation.description,
+                   Relation.secondary_object_ids)
+            .execution_options(yield_per=STREAM_FETCH_SIZE)
+        )
+
+    def iter_hierarchy_rows(self) -> Iterator[Row]:
+        return self.db.execute(
+            select(Hierarchy.parent_object_id, Hierarchy.child_object_ids, Hierarchy.level)
+            .execution_options(yield_per=STREAM_FETCH_SIZE)
+        )
+
+    # Bulk export: whole tables, streamed so memory stays flat at any size
+    def use_read_snapshot(self, snapshot_id: Optional[str] = None) -> None:
+        """Make this session's transaction REPEATABLE READ and READ ONLY, so every query in it reads
+        the same snapshot, or the one another transaction exported with export_snapshot;
+        must be called before the session's first query"""
+        self.db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+        if snapshot_id is not None:
+            self.db.execute(text("SET TRANSACTION SNAPSHOT :snapshot_id"), {"snapshot_id": snapshot_id})
+
+    def export_snapshot(self) -> str:
+        """Pin this session to one snapshot and return its id for use_read_snapshot in other sessions;
+        it stays importable until this session's transaction ends"""
+        self.use_read_snapshot()
+        return self.db.execute(text("SELECT pg_export_snapshot()")).scalar()
+
+    def iter_table_rows(self, table: Table) -> Iterator[Row]:
+        return self.db.execute(select(table).execution_options(yield_per=STREAM_FETCH_SIZE))
+
+    def iter_table_json(self, table: Table) -> Iterator[str]:
+        """One JSON document per row, serialized by Postgres"""
+        return self.db.execute(
+            select(cast(func.row_to_json(table.table_valued()), Text))
+            .select_from(table)
+            .execution_options(yield_per=STREAM_FETCH_SIZE)
+        ).scalars()
+
+    def copy_table_csv(self, table: Table, output: BinaryIO) -> None:
+        """COPY a table to output as CSV with a header row"""
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} TO STDOUT WITH (FORMAT csv, HEADER)", output)
+        finally:
+            cursor.close()
+
  
     # User methods
     def get_user(self, user_id: uuid.UUID) -> Optional[User]:
@@ -0,0 +1,202 @@
+from sqlalchemy import Table, Integer, JSON, TIMESTAMP, LargeBinary
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Callable, Iterator, Optional
+from app.models.models import (
+    ObjectType, ObjectTable, ObjectTableRow, Relation, Hierarchy, Types, RelationType, HierarchyType,
+    relation_secondary_objects
+)
+from app.services.database import DatabaseService, STREAM_FETCH_SIZE
+from io import BytesIO
+import json
+import queue
+import threading
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow export is optional
+    pa = None
+
+
+# Exported tables in dependency order, so a bundle can be loaded front to back
+EXPORT_TABLES: Dict[str, Table] = {
+    table.name: table for table in [
+        Types.__table__,
+        RelationType.__table__,
+        HierarchyType.__table__,
+        ObjectType.__table__,
+        ObjectTable.__table__,
+        ObjectTableRow.__table__,
+        Relation.__table__,
+        relation_secondary_objects,
+        Hierarchy.__table__,
+    ]
+}
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Chunks buffered between COPY and the client; a slow client pauses the COPY
+EXPORT_QUEUE_CHUNKS = 16
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class _ChunkWriter:
+    """File-like COPY target that batches rows into chunks on a bounded queue"""
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.buffer = bytearray()
+
+    def write(self, data) -> int:
+        self.buffer += data
+        if len(self.buffer) >= EXPORT_CHUNK_BYTES:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+        chunk, self.buffer = bytes(self.buffer), bytearray()
+        self.send(chunk)
+
+    def send(self, item: Any) -> None:
+        while True:
+            if self.cancelled.is_set():
+                raise ExportCancelled()
+            try:
+                self.chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+
+class ExportService:
+    """Streams the design graph out as NDJSON, CSV or Arrow IPC in constant memory.
+
+    NDJSON covers every table in one stream, one {"table", "row"} document per
+    line. CSV and Arrow hold a single schema per stream, so they export one
+    table at a time.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    def stream(self, export_format: str, table_name: Optional[str] = None) -> Iterator[bytes]:
+        if export_format == "csv":
+            return self.stream_csv(EXPORT_TABLES[table_name])
+        if export_format == "arrow":
+            return self.stream_arrow(EXPORT_TABLES[table_name])
+        tables = [EXPORT_TABLES[table_name]] if table_name else list(EXPORT_TABLES.values())
+        return self.stream_ndjson(tables)
+
+    def stream_ndjson(self, tables: List[Table]) -> Iterator[bytes]:
+        db = self.session_factory()
+        try:
+            db_service = DatabaseService(db)
+            # One snapshot for every table, so relations never point at objects missing from the bundle
+            db_service.use_read_snapshot()
+            buffer = []
+            size = 0
+            for table in tables:
+                prefix = f'{{"table":{json.dumps(table.name)},"row":'
+                for row_json in db_service.iter_table_json(table):
+                    line = f"{prefix}{row_json}}}\n"
+                    buffer.append(line)
+                    size += len(line)
+                    if size >= EXPORT_CHUNK_BYTES:
+                        yield "".join(buffer).encode()
+                        buffer, size = [], 0
+            if buffer:
+                yield "".join(buffer).encode()
+        finally:
+            db.close()
+
+    def stream_csv(self, table: Table) -> Iterator[bytes]:
+        """COPY runs on its own thread and hands chunks over as the client reads them"""
+        chunks = queue.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+        cancelled = threading.Event()
+        done = object()
+
+        def run_copy():
+            writer = _ChunkWriter(chunks, cancelled)
+            db = self.session_factory()
+            try:
+                DatabaseService(db).copy_table_csv(table, writer)
+                writer.flush()
+                writer.send(done)
+            except ExportCancelled:
+                pass
+            except Exception as e:
+                try:
+                    writer.send(e)
+                except ExportCancelled:
+                    pass
+            finally:
+                db.close()
+
+        try:
+            threading.Thread(target=run_copy, name="export-copy", daemon=True).start()
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            # Client went away or the stream ended; unblock the COPY thread
+            cancelled.set()
+
+    def stream_arrow(self, table: Table) -> Iterator[bytes]:
+        schema = pa.schema([(column.name, self._arrow_type(column.type)) for column in table.columns])
+        sink = BytesIO()
+        db = self.session_factory()
+        try:
+            with pa.ipc.new_stream(sink, schema) as writer:
+                batch = []
+                for row in DatabaseService(db).iter_table_rows(table):
+                    batch.append(row)
+                    if len(batch) >= STREAM_FETCH_SIZE:
+                        writer.write_batch(self._arrow_batch(table, schema, batch))
+                        batch = []
+                        yield self._drain(sink)
+                if batch:
+                    writer.write_batch(self._arrow_batch(table, schema, batch))
+            yield self._drain(sink)
+        finally:
+            db.close()
+
+    def _arrow_batch(self, table: Table, schema: Any, rows: List[Any]) -> Any:
+        columns = []
+        for index, column in enumerate(table.columns):
+            values = [row[index] for row in rows]
+            if isinstance(column.type, JSON):
+                values = [None if value is None else json.dumps(value) for value in values]
+            elif not isinstance(column.type, (Integer, TIMESTAMP, LargeBinary)):
+                values = [None if value is None else str(value) for value in values]
+            columns.append(pa.array(values, type=schema.field(index).type))
+        return pa.record_batch(columns, schema=schema)
+
+    @staticmethod
+    def _arrow_type(column_type: Any) -> Any:
+        # JSON columns travel as JSON text and UUIDs as strings
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, TIMESTAMP):
+            return pa.timestamp("us")
+        if isinstance(column_type, LargeBinary):
+            return pa.binary()
+        return pa.string()
+
+    @staticmethod
+    def _drain(sink: BytesIO) -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
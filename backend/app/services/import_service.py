@@ -0,0 +1,342 @@
+from sqlalchemy import Table, Integer, JSON, TIMESTAMP, LargeBinary, text, select, column, table as table_clause
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Callable, AsyncIterator, Optional, Tuple
+from app.models.models import ObjectTable
+from app.services.database import DatabaseService
+from app.services.export_service import EXPORT_TABLES, pa
+from app.schemas.schemas import ImportResult, ImportTableResult, ImportRejectedRow
+from io import StringIO
+import asyncio
+import datetime
+import json
+import tempfile
+import uuid
+
+
+# Staged text buffered per table before it is sent with COPY
+IMPORT_COPY_BYTES = 1024 * 1024
+IMPORT_MAX_REPORTED_REJECTS = 1000
+
+# Catalog counter bumped when a table receives rows
+IMPORT_COUNTERS = {
+    "object_types": "types",
+    "relation_types": "types",
+    "hierarchy_type": "types",
+    "objects": "objects",
+    "object_tables": "objects",
+    "object_table_rows": "objects",
+    "relations": "relations",
+    "relation_secondary_objects": "relations",
+    "hierarchies": "hierarchies",
+}
+
+# Change log entity and id column per staged table; table rows count as a change to their object
+IMPORT_CHANGES = {
+    "objects": ("objects", select(column("id")).select_from(table_clause("import_objects"))),
+    "object_tables": ("objects", select(column("object_id")).select_from(table_clause("import_object_tables"))),
+    "object_table_rows": ("objects", select(ObjectTable.object_id).where(
+        ObjectTable.id.in_(select(column("table_id")).select_from(table_clause("import_object_table_rows")))
+    )),
+    "relations": ("relations", select(column("id")).select_from(table_clause("import_relations"))),
+    "relation_secondary_objects": ("relations", select(column("relation_id")).select_from(table_clause("import_relation_secondary_objects"))),
+    "hierarchies": ("hierarchies", select(column("id")).select_from(table_clause("import_hierarchies"))),
+}
+
+# JSON columns holding object id lists; validated like foreign keys
+ID_LIST_COLUMNS = {"relations": "secondary_object_ids", "hierarchies": "child_object_ids"}
+
+
+def _known(table: str, column: str, value: str) -> str:
+    """SQL condition: value exists in the table or among its staged rows"""
+    return (
+        f"EXISTS (SELECT 1 FROM (SELECT {column} FROM {table} UNION ALL SELECT {column} FROM import_{table}) k "
+        f"WHERE k.{column} = {value})"
+    )
+
+
+# Set-based checks run in dependency order, so a rejected row also rejects rows that point at it.
+# Each condition is true for staged rows (alias s) that must be rejected.
+REFERENCE_CHECKS = [
+    ("object_types", "object_type is used by another type id",
+     "EXISTS (SELECT 1 FROM object_types t WHERE t.object_type = s.object_type AND t.id <> s.id)"),
+    ("relation_types", "unknown primary_type", f"NOT {_known('object_types', 'id', 's.primary_type')}"),
+    ("relation_types", "unknown secondary_type", f"NOT {_known('object_types', 'id', 's.secondary_type')}"),
+    ("hierarchy_type", "unknown object_type",
+     f"s.object_type IS NOT NULL AND NOT {_known('object_types', 'id', 's.object_type')}"),
+    ("objects", "unknown type", f"NOT {_known('object_types', 'object_type', 's.type')}"),
+    ("object_tables", "unknown object_id", f"NOT {_known('objects', 'id', 's.object_id')}"),
+    ("object_tables", "name is used by another table of the object",
+     "EXISTS (SELECT 1 FROM object_tables t WHERE t.object_id = s.object_id AND t.name = s.name AND t.id <> s.id)"),
+    ("object_table_rows", "unknown table_id", f"NOT {_known('object_tables', 'id', 's.table_id')}"),
+    ("relations", "unknown primary_object_id", f"NOT {_known('objects', 'id', 's.primary_object_id')}"),
+    ("relations", "unknown id in secondary_object_ids",
+     "EXISTS (SELECT 1 FROM jsonb_array_elements_text(coalesce(s.secondary_object_ids::jsonb, '[]'::jsonb)) e(id) "
+     f"WHERE NOT {_known('objects', 'id', 'e.id::uuid')})"),
+    ("relation_secondary_objects", "unknown relation_id", f"NOT {_known('relations', 'id', 's.relation_id')}"),
+    ("relation_secondary_objects", "unknown object_id", f"NOT {_known('objects', 'id', 's.object_id')}"),
+    ("hierarchies", "unknown parent_object_id",
+     f"s.parent_object_id IS NOT NULL AND NOT {_known('objects', 'id', 's.parent_object_id')}"),
+    ("hierarchies", "unknown id in child_object_ids",
+     "EXISTS (SELECT 1 FROM jsonb_array_elements_text(coalesce(s.child_object_ids::jsonb, '[]'::jsonb)) e(id) "
+     f"WHERE NOT {_known('objects', 'id', 'e.id::uuid')})"),
+]
+
+
+def _quote(name: str) -> str:
+    return f'"{name}"'
+
+
+def _copy_field(value: Any) -> str:
+    """One field in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def coerce_row(table: Table, row: Dict[str, Any], json_as_text: bool = False) -> List[Any]:
+    """Column values for a staged row; raises ValueError with the reason it is rejected"""
+    values = []
+    for column in table.columns:
+        value = row.get(column.name)
+        if value is None:
+            if column.primary_key:
+                raise ValueError(f"missing {column.name}")
+            if column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+            elif column.server_default is None and not column.nullable:
+                raise ValueError(f"missing {column.name}")
+        if value is None:
+            values.append(None)
+            continue
+
+        try:
+            if isinstance(column.type, UUID):
+                value = str(uuid.UUID(str(value)))
+            elif isinstance(column.type, Integer):
+                if isinstance(value, bool):
+                    raise ValueError()
+                value = int(value)
+            elif isinstance(column.type, TIMESTAMP):
+                value = datetime.datetime.fromisoformat(str(value)).isoformat()
+            elif isinstance(column.type, JSON):
+                if json_as_text and isinstance(value, str):
+                    value = json.loads(value)
+            elif isinstance(column.type, LargeBinary):
+                # bytea hex input format; NDJSON carries it as exported by row_to_json
+                hex_digits = value.hex() if isinstance(value, bytes) else str(value).removeprefix("\\x")
+                value = "\\x" + bytes.fromhex(hex_digits).hex()
+            else:
+                value = str(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid {column.name}")
+
+        if ID_LIST_COLUMNS.get(table.name) == column.name:
+            try:
+                value = [str(uuid.UUID(str(object_id))) for object_id in value]
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid {column.name}")
+        values.append(value)
+    return values
+
+
+class _StagedImport:
+    """Temp tables for one import, filled with COPY and merged in the session's transaction"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.buffers = {name: StringIO() for name in EXPORT_TABLES}
+
+    def create_tables(self) -> None:
+        for name in EXPORT_TABLES:
+            # CREATE TABLE AS keeps column types but not NOT NULL, so defaults can be applied at merge time
+            self.db.execute(text(f"CREATE TEMP TABLE import_{name} ON COMMIT DROP AS SELECT * FROM {name} WITH NO DATA"))
+            self.db.execute(text(f"ALTER TABLE import_{name} ADD COLUMN import_line bigint"))
+        self.db.execute(text(
+            "CREATE TEMP TABLE import_rejects (import_line bigint, table_name text, reason text) ON COMMIT DROP"
+        ))
+
+    def add(self, table: Table, line: int, values: List[Any]) -> bool:
+        """Buffer a row; True once the table's buffer should be flushed"""
+        buffer = self.buffers[table.name]
+        buffer.write("\t".join([str(line)] + [_copy_field(value) for value in values]))
+        buffer.write("\n")
+        return buffer.tell() >= IMPORT_COPY_BYTES
+
+    def flush(self, name: str) -> None:
+        buffer = self.buffers[name]
+        if not buffer.tell():
+            return
+        buffer.seek(0)
+        columns = ", ".join(["import_line"] + [_quote(column.name) for column in EXPORT_TABLES[name].columns])
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY import_{name} ({columns}) FROM STDIN", buffer)
+        finally:
+            cursor.close()
+        self.buffers[name] = StringIO()
+
+    def merge(self, parse_rejects: List[ImportRejectedRow], parse_reject_count: int) -> ImportResult:
+        for name in EXPORT_TABLES:
+            self.flush(name)
+            self.db.execute(text(f"ANALYZE import_{name}"))
+
+        for name, table in EXPORT_TABLES.items():
+            # Keep the last row per key, as replaying the rows one by one would
+            same_key = " AND ".join(f"s.{_quote(c.name)} = d.{_quote(c.name)}" for c in table.primary_key.columns)
+            self._reject(name, "superseded by a later row with the same key",
+                         f"DELETE FROM import_{name} s USING import_{name} d WHERE {same_key} AND s.import_line < d.import_line")
+        for name, reason, condition in REFERENCE_CHECKS:
+            self._reject(name, reason, f"DELETE FROM import_{name} s WHERE {condition}")
+
+        results = {}
+        for name, table in EXPORT_TABLES.items():
+            inserted, updated = self._merge_table(table)
+            results[name] = ImportTableResult(inserted=inserted, updated=updated)
+            id_column = table.c.get("id")
+            if id_column is not None and isinstance(id_column.type, Integer):
+                # Imported explicit ids; move the serial past them
+                self.db.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), GREATEST((SELECT max(id) FROM {name}), 1))"
+                ))
+
+        db_service = DatabaseService(self.db)
+        db_service.bump_catalog_counters(sorted({
+            IMPORT_COUNTERS[name] for name, result in results.items() if result.inserted or result.updated
+        }))
+        for name, (entity, id_query) in IMPORT_CHANGES.items():
+            if results[name].inserted or results[name].updated:
+                db_service.record_changes(entity, id_query)
+
+        # Temp tables drop on commit, so read the rejects first
+        sql_reject_count = self.db.execute(text("SELECT count(*) FROM import_rejects")).scalar()
+        sql_rejects = [
+            ImportRejectedRow(line=line, table=table_name, reason=reason)
+            for line, table_name, reason in self.db.execute(text(
+                f"SELECT import_line, table_name, reason FROM import_rejects ORDER BY import_line LIMIT {IMPORT_MAX_REPORTED_REJECTS}"
+            ))
+        ]
+        self.db.commit()
+
+        return ImportResult(
+            tables=results,
+            rejected_count=parse_reject_count + sql_reject_count,
+            rejected=sorted(parse_rejects + sql_rejects, key=lambda reject: reject.line)[:IMPORT_MAX_REPORTED_REJECTS]
+        )
+
+    def _reject(self, name: str, reason: str, delete_sql: str) -> None:
+        self.db.execute(text(
+            f"WITH rejected AS ({delete_sql} RETURNING s.import_line) "
+            f"INSERT INTO import_rejects SELECT import_line, :table_name, :reason FROM rejected"
+        ), {"table_name": name, "reason": reason})
+
+    def _merge_table(self, table: Table) -> Tuple[int, int]:
+        columns = [column.name for column in table.columns]
+        key_columns = [column.name for column in table.primary_key.columns]
+        values = []
+        for column in table.columns:
+            if column.server_default is not None:
+                default = column.server_default.arg
+                default_sql = default if isinstance(default, str) else str(default.compile(dialect=postgresql.dialect()))
+                values.append(f"COALESCE({_quote(column.name)}, {default_sql})")
+            else:
+                values.append(_quote(column.name))
+
+        updates = [f"{_quote(name)} = EXCLUDED.{_quote(name)}" for name in columns if name not in key_columns]
+        on_conflict = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        inserted, updated = self.db.execute(text(
+            f"WITH merged AS ("
+            f"INSERT INTO {table.name} ({', '.join(_quote(name) for name in columns)}) "
+            f"SELECT {', '.join(values)} FROM import_{table.name} ORDER BY import_line "
+            f"ON CONFLICT ({', '.join(_quote(name) for name in key_columns)}) {on_conflict} "
+            f"RETURNING (xmax = 0) AS inserted"
+            f") SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged"
+        )).one()
+        return inserted, updated
+
+
+class ImportService:
+    """Loads an exported bundle back in: rows are validated as they stream in,
+    staged with COPY, checked for references in SQL and merged in one transaction.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    async def import_bundle(self, body: AsyncIterator[bytes], import_format: str = "ndjson", table_name: Optional[str] = None) -> ImportResult:
+        parse_rejects: List[ImportRejectedRow] = []
+        parse_reject_count = 0
+        db = self.session_factory()
+        try:
+            staged = _StagedImport(db)
+            await asyncio.to_thread(staged.create_tables)
+
+            if import_format == "arrow":
+                rows = self._arrow_rows(body, EXPORT_TABLES[table_name])
+            else:
+                rows = self._ndjson_rows(body)
+            async for line, table, row, error in rows:
+                if error is None:
+                    try:
+                        values = coerce_row(table, row, json_as_text=import_format == "arrow")
+                    except ValueError as e:
+                        error = str(e)
+                if error is not None:
+                    parse_reject_count += 1
+                    if len(parse_rejects) < IMPORT_MAX_REPORTED_REJECTS:
+                        parse_rejects.append(ImportRejectedRow(line=line, table=table.name if table is not None else None, reason=error))
+                    continue
+                if staged.add(table, line, values):
+                    await asyncio.to_thread(staged.flush, table.name)
+
+            return await asyncio.to_thread(staged.merge, parse_rejects, parse_reject_count)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _ndjson_rows(self, body: AsyncIterator[bytes]):
+        """(line, table, row, error) for each {"table", "row"} line, parsed as the body arrives"""
+        line = 0
+        pending = b""
+        async for chunk in body:
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for raw in lines:
+                line += 1
+                if raw.strip():
+                    yield self._parse_line(line, raw)
+        if pending.strip():
+            yield self._parse_line(line + 1, pending)
+
+    @staticmethod
+    def _parse_line(line: int, raw: bytes) -> Tuple[int, Optional[Table], Optional[Dict[str, Any]], Optional[str]]:
+        try:
+            document = json.loads(raw)
+        except ValueError:
+            return line, None, None, "invalid JSON"
+        if not isinstance(document, dict) or document.get("table") not in EXPORT_TABLES:
+            return line, None, None, "unknown table"
+        table = EXPORT_TABLES[document["table"]]
+        if not isinstance(document.get("row"), dict):
+            return line, table, None, "row must be a JSON object"
+        return line, table, document["row"], None
+
+    async def _arrow_rows(self, body: AsyncIterator[bytes], table: Table):
+        """(row number, table, row, None) for each row of an Arrow IPC stream"""
+        # pyarrow reads from a file, so the body is spooled (to disk once large) first
+        with tempfile.SpooledTemporaryFile(max_size=IMPORT_COPY_BYTES) as spool:
+            async for chunk in body:
+                spool.write(chunk)
+            spool.seek(0)
+
+            line = 0
+            reader = pa.ipc.open_stream(spool)
+            for batch in reader:
+                for row in batch.to_pylist():
+                    line += 1
+                    yield line, table, row, None
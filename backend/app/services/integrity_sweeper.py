@@ -0,0 +1,66 @@
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Optional
+from app.services.database import DatabaseService
+import threading
+
+
+# Entities whose rows reference objects, in the order they are swept
+SWEPT_ENTITIES = ["relations", "hierarchies"]
+
+
+class IntegritySweeper:
+    """Finds and repairs references to deleted objects in the background.
+
+    delete_object cleans up after itself; this catches references left by
+    older deletes or by writes made outside the API. Each batch is its own
+    short transaction, with a pause in between so the sweep never competes
+    with interactive traffic for long.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], batch_size: int, pause_seconds: float, interval_seconds: float):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.interval_seconds = interval_seconds
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="integrity-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def sweep(self) -> Dict[str, int]:
+        """One pass over every swept entity; returns repaired rows per entity"""
+        repaired = {}
+        for entity in SWEPT_ENTITIES:
+            repaired[entity] = 0
+            after = None
+            while not self._stopped.is_set():
+                db = self.session_factory()
+                try:
+                    after, count = DatabaseService(db).repair_dangling_references(entity, after, self.batch_size)
+                finally:
+                    db.close()
+                repaired[entity] += count
+                if after is None:
+                    break
+                self._stopped.wait(self.pause_seconds)
+        return repaired
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                repaired = self.sweep()
+                if any(repaired.values()):
+                    print(f"Integrity sweep repaired dangling references: {repaired}")
+            except Exception as e:
+                print(f"Warning: integrity sweep failed: {e}")
+            self._stopped.wait(self.interval_seconds)
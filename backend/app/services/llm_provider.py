@@ -0,0 +1,118 @@
+from abc import ABC, abstractmethod
+import openai
+from typing import List, Dict, Optional
+from app.core.config import settings
+from app.utils.tokens import estimate_tokens
+import hashlib
+import json
+import re
+import time
+
+
+class LLMProvider(ABC):
+    """Chat-completion backend used by AIService"""
+
+    @abstractmethod
+    def complete(self, messages: List[Dict[str, str]], json_mode: bool = False, timeout: Optional[float] = None) -> str:
+        ...
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI or any server exposing the OpenAI chat completions API (set base_url)"""
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None):
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        self.model = model
+
+    def complete(self, messages: List[Dict[str, str]], json_mode: bool = False, timeout: Optional[float] = None) -> str:
+        kwargs = {}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        response = self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+        return response.choices[0].message.content or ""
+
+
+class LocalProvider(LLMProvider):
+    """Deterministic in-process provider for offline load testing and profiling.
+
+    Latency is simulated as a fixed time-to-first-token plus output tokens at a
+    fixed rate. JSON-mode prompts are answered in the search result format by
+    scoring every object line in the prompt on query-term overlap.
+    """
+
+    def __init__(self, latency_ms: float, tokens_per_second: float, response_tokens: int):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+
+    def complete(self, messages: List[Dict[str, str]], json_mode: bool = False, timeout: Optional[float] = None) -> str:
+        prompt = messages[-1]["content"] if messages else ""
+        content = self._search_response(prompt) if json_mode else self._chat_response(prompt)
+
+        delay = self.latency_ms / 1000
+        if self.tokens_per_second > 0:
+            delay += estimate_tokens(content) / self.tokens_per_second
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Local provider timed out")
+        time.sleep(delay)
+        return content
+
+    def _search_response(self, prompt: str) -> str:
+        query_match = re.search(r'search query: "(.*)"', prompt)
+        query = query_match.group(1) if query_match else ""
+        terms = {term for term in re.findall(r"\w{3,}", query.lower())}
+
+        scored = []
+        for line in prompt.splitlines():
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "id" not in entry:
+                continue
+            text = line.lower()
+            hits = sum(term in text for term in terms)
+            scored.append((hits + self._fraction(query + entry["id"]), entry["id"]))
+
+        scored.sort(reverse=True)
+        top = scored[:settings.search_top_k]
+        best = top[0][0] if top and top[0][0] > 0 else 1
+        return json.dumps({
+            "results": [{
+                "object_id": object_id,
+                "relevance": round(score / best, 3),
+                "reasoning": "Local provider term overlap"
+            } for score, object_id in top],
+            "query_analysis": f"Local provider matched terms: {', '.join(sorted(terms)) or 'none'}"
+        })
+
+    def _chat_response(self, prompt: str) -> str:
+        seed = hashlib.sha256(prompt.encode()).hexdigest()
+        words = [seed[i:i + 6] for i in range(0, len(seed), 6)]
+        body = " ".join(words[i % len(words)] for i in range(self.response_tokens))
+        return f"Local provider response {seed[:8]}: {body}"
+
+    @staticmethod
+    def _fraction(value: str) -> float:
+        # Stable tie-breaker in [0, 1) so equal scores still have a fixed order
+        return int(hashlib.sha256(value.encode()).hexdigest()[:8], 16) / 2 ** 32
+
+
+def create_llm_provider() -> Optional[LLMProvider]:
+    """Provider selected by settings, or None when AI features are unavailable"""
+    if settings.llm_provider == "local":
+        return LocalProvider(
+            settings.local_llm_latency_ms,
+            settings.local_llm_tokens_per_second,
+            settings.local_llm_response_tokens
+        )
+    if settings.openai_api_key:
+        return OpenAIProvider(settings.openai_api_key, settings.llm_model, settings.llm_base_url)
+    return None
@@ -0,0 +1,40 @@
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional
+from app.models.models import ObjectType
+import uuid
+
+
+class ObjectLoader:
+    """Request-scoped object cache that batches lookups.
+
+    Callers pass every id they need at once to get_many, which fetches the
+    ones not yet cached in a single IN query. Results, misses included, are
+    kept for the rest of the request, which is the lifetime of its
+    DatabaseService.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._cache: Dict[uuid.UUID, Optional[ObjectType]] = {}
+
+    def get(self, object_id: uuid.UUID) -> Optional[ObjectType]:
+        return self.get_many([object_id])[0]
+
+    def get_many(self, object_ids: Iterable[uuid.UUID]) -> List[Optional[ObjectType]]:
+        """Objects in the order asked for, None where missing; one query for everything not yet cached"""
+        object_ids = list(object_ids)
+        self._fetch([object_id for object_id in dict.fromkeys(object_ids) if object_id not in self._cache])
+        return [self._cache[object_id] for object_id in object_ids]
+
+    def prime(self, obj: ObjectType) -> None:
+        self._cache[obj.id] = obj
+
+    def forget(self, object_id: uuid.UUID) -> None:
+        self._cache.pop(object_id, None)
+
+    def _fetch(self, object_ids: List[uuid.UUID]) -> None:
+        if not object_ids:
+            return
+        found = {obj.id: obj for obj in self.db.query(ObjectType).filter(ObjectType.id.in_(object_ids)).all()}
+        for object_id in object_ids:
+            self._cache[object_id] = found.get(object_id)
@@ -0,0 +1,64 @@
+from typing import Optional, Set
+import glob
+import os
+import shutil
+import time
+import uuid
+
+
+class ReportCache:
+    """Rendered PDFs on disk keyed by kind and data version.
+
+    A file's mtime is the time its data version was read. Storing a version
+    drops only the versions of the same kind read before it, so a render that
+    finishes late never removes a newer one.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def path(self, kind: str, version: str) -> str:
+        return os.path.join(self.cache_dir, f"{kind}-{version}.pdf")
+
+    def get(self, kind: str, version: str) -> Optional[str]:
+        path = self.path(kind, version)
+        return path if os.path.exists(path) else None
+
+    def temp_path(self) -> str:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return os.path.join(self.cache_dir, f".{uuid.uuid4()}.tmp")
+
+    def put(self, kind: str, version: str, source_path: str, data_time: float) -> str:
+        """Move a rendered file into the cache and drop versions of the same kind older than data_time"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(kind, version)
+        # Stamped before the rename, so no other put sees this version with a misleading age
+        os.utime(source_path, (data_time, data_time))
+        try:
+            os.replace(source_path, path)
+        except OSError:
+            # Source is on another filesystem; copy next to the target so the final rename stays atomic
+            staging_path = self.temp_path()
+            shutil.copyfile(source_path, staging_path)
+            os.utime(staging_path, (data_time, data_time))
+            os.replace(staging_path, path)
+
+        for stale_path in glob.glob(os.path.join(self.cache_dir, f"{kind}-*.pdf")):
+            if stale_path != path:
+                try:
+                    if os.path.getmtime(stale_path) < data_time:
+                        os.remove(stale_path)
+                except FileNotFoundError:
+                    pass
+        return path
+
+    def expire(self, prefix: str, ttl_seconds: float, keep: Set[str]) -> None:
+        """Remove files of kinds starting with prefix whose data is older than ttl_seconds, except the paths in keep"""
+        cutoff = time.time() - ttl_seconds
+        for path in glob.glob(os.path.join(self.cache_dir, f"{prefix}*.pdf")):
+            if path not in keep:
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, Tuple
+from app.db.base import SessionLocal
+from app.services.report_service import ReportService, report_version
+from app.services.report_cache import ReportCache
+import datetime
+import os
+import threading
+import time
+import uuid
+
+
+class ReportJob:
+    def __init__(self, report_type: str, version: str):
+        self.id = uuid.uuid4()
+        self.report_type = report_type
+        self.version = version  # data version, also served as the ETag
+        self.data_time = time.time()  # when the catalog versions behind it were read
+        self.status = "queued"  # 'queued' | 'running' | 'completed' | 'failed'
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.path: Optional[str] = None
+        self.created_date = datetime.datetime.utcnow()
+        self.completed_date: Optional[datetime.datetime] = None
+        self.expires_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def filename(self) -> str:
+        return f"object-design-{self.report_type}-report-{self.created_date.strftime('%Y-%m-%d')}.pdf"
+
+
+class ReportJobManager:
+    """Renders reports on a bounded worker pool into the report cache.
+
+    A report whose data version is already cached completes immediately, and
+    concurrent requests for the same version share one render.
+    """
+
+    def __init__(self, report_service: ReportService, cache: ReportCache, max_workers: int, ttl_seconds: int):
+        self.report_service = report_service
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._jobs: Dict[uuid.UUID, ReportJob] = {}
+        self._inflight: Dict[Tuple[str, str], ReportJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, report_type: str, versions: Dict[str, Any]) -> ReportJob:
+        self.purge_expired()
+        version = report_version(report_type, versions)
+
+        with self._lock:
+            inflight = self._inflight.get((report_type, version))
+            if inflight:
+                return inflight
+
+            job = ReportJob(report_type, version)
+            self._jobs[job.id] = job
+            cached_path = self.cache.get(f"report-{report_type}", version)
+            if cached_path:
+                job.future = Future()
+                self._finish(job, cached_path)
+                job.future.set_result(None)
+                return job
+
+            self._inflight[(report_type, version)] = job
+        job.future = self._executor.submit(self._run, job, versions)
+        return job
+
+    def get(self, job_id: uuid.UUID) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def purge_expired(self) -> None:
+        """Drop expired job records, then cached PDFs older than the TTL that no remaining job serves"""
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.expires_at and job.expires_at <= now]
+            for job in expired:
+                del self._jobs[job.id]
+            # Under the lock, so a cache hit can't pick up a file as it is removed
+            self.cache.expire("report-", self.ttl_seconds, {job.path for job in self._jobs.values() if job.path})
+
+    def _run(self, job: ReportJob, versions: Dict[str, Any]) -> None:
+        job.status = "running"
+        tmp_path = self.cache.temp_path()
+
+        def on_progress(fraction: float):
+            # Loading data is the first 10%, layout the rest
+            job.progress = round(0.1 + 0.9 * fraction, 3)
+
+        try:
+            # Workers run outside the request, so the report opens its own sessions
+            with open(tmp_path, "wb") as output:
+                self.report_service.generate_report(job.report_type, SessionLocal, output, on_progress, versions, job.data_time)
+            self._finish(job, self.cache.put(f"report-{job.report_type}", job.version, tmp_path, job.data_time))
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.completed_date = datetime.datetime.utcnow()
+            job.expires_at = time.time() + self.ttl_seconds
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            with self._lock:
+                self._inflight.pop((job.report_type, job.version), None)
+
+    def _finish(self, job: ReportJob, path: str) -> None:
+        job.path = path
+        job.progress = 1.0
+        job.status = "completed"
+        job.completed_date = datetime.datetime.utcnow()
+        job.expires_at = time.time() + self.ttl_seconds
@@ -3,14 +3,142 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from typing import List
+from reportlab.pdfgen import canvas
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, BinaryIO, Iterator, Iterable
+from sqlalchemy.orm import Session
 from app.models.models import ObjectType, Relation, Hierarchy
+from app.services.database import DatabaseService
+from app.services.report_cache import ReportCache
+from app.core.config import settings
 from io import BytesIO
 import datetime
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # stitched rendering needs pypdf to join section PDFs
+    PdfReader = PdfWriter = None
+
+
+REPORT_TYPES = ["objects", "relations", "hierarchies", "full"]
+FULL_REPORT_SECTIONS = [("objects", "OBJECTS"), ("relations", "RELATIONS"), ("hierarchies", "HIERARCHIES")]
+
+
+# Data each report section renders; object names appear in every section
+SECTION_DEPENDENCIES = {
+    "objects": ["objects"],
+    "relations": ["objects", "relations"],
+    "hierarchies": ["objects", "hierarchies"],
+}
+REPORT_SECTIONS = {
+    "objects": ["objects"],
+    "relations": ["relations"],
+    "hierarchies": ["hierarchies"],
+    "full": ["objects", "relations", "hierarchies"],
+}
+# Queries each report runs, projected to the columns it renders; the full
+# report's objects section shows descriptions but never attributes or tables
+REPORT_DATA_PLANS = {
+    "relations": {
+        "objects": lambda db_service: db_service.iter_object_summaries(),
+        "relations": lambda db_service: db_service.iter_relation_rows(),
+    },
+    "hierarchies": {
+        "objects": lambda db_service: db_service.iter_object_summaries(),
+        "hierarchies": lambda db_service: db_service.iter_hierarchy_rows(),
+    },
+    "full": {
+        "objects": lambda db_service: db_service.iter_object_summaries(with_description=True),
+        "relations": lambda db_service: db_service.iter_relation_rows(),
+        "hierarchies": lambda db_service: db_service.iter_hierarchy_rows(),
+    },
+}
+
+
+def section_version(section: str, versions: Dict[str, Any]) -> str:
+    parts = [f"{name}={versions.get(name, 0)}" for name in SECTION_DEPENDENCIES[section]]
+    parts.append(f"objects_modified={versions.get('objects_modified', '')}")
+    return hashlib.sha1(f"{section}|{'|'.join(parts)}".encode()).hexdigest()[:16]
+
+
+def report_version(report_type: str, versions: Dict[str, Any]) -> str:
+    """Changes whenever any data the report renders has changed"""
+    parts = [section_version(section, versions) for section in REPORT_SECTIONS[report_type]]
+    return hashlib.sha1(f"{report_type}|{'|'.join(parts)}".encode()).hexdigest()[:16]
+
+
+class LazyStory(list):
+    """Flowable list that ReportLab consumes from the front while it is refilled from a generator.
+
+    Groups (all flowables of one record) are pulled a few hundred at a time, so
+    the full story never exists in memory and keep-with-next lookahead still
+    sees whole records.
+    """
+
+    def __init__(self, groups: Iterator[List[Any]], low_water: int = 256):
+        super().__init__()
+        self._groups = groups
+        self._low_water = low_water
+        self._groups_pulled = 0
+        self._refill()
+
+    @property
+    def groups_consumed(self) -> int:
+        return self._groups_pulled
+
+    def _refill(self) -> None:
+        while self._groups is not None and len(self) < 2 * self._low_water:
+            group = next(self._groups, None)
+            if group is None:
+                self._groups = None
+                break
+            self._groups_pulled += 1
+            self.extend(group)
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        if len(self) < self._low_water:
+            self._refill()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        if len(self) < self._low_water:
+            self._refill()
+        return item
+
+
+def normalize_id(value: Any) -> Optional[uuid.UUID]:
+    """Coerce UUIDs and JSON-stored id strings to one comparable type"""
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def build_object_index(objects: List[ObjectType]) -> Dict[uuid.UUID, ObjectType]:
+    return {obj.id: obj for obj in objects}
+
+
+def group_by_parent(hierarchies: List[Hierarchy]) -> Dict[Optional[uuid.UUID], List[Hierarchy]]:
+    """Hierarchies grouped by parent id, root-level ones under None"""
+    parent_groups = {}
+    for hierarchy in hierarchies:
+        parent_groups.setdefault(normalize_id(hierarchy.parent_object_id), []).append(hierarchy)
+    return parent_groups
 
 
 class ReportService:
-    def __init__(self):
+    def __init__(self, cache: Optional[ReportCache] = None):
+        self.cache = cache
         self.styles = getSampleStyleSheet()
         self.title_style = ParagraphStyle(
             'CustomTitle',
@@ -25,191 +153,381 @@ class ReportService:
             spaceAfter=20,
         )
         self.normal_style = self.styles['Normal']
+        self._process_pool = None
+        self._pool_lock = threading.Lock()
 
-    def generate_objects_report(self, objects: List[ObjectType]) -> BytesIO:
-        """Generate PDF report for objects"""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, margins=[50, 50, 50, 50])
-        story = []
+    def generate_report(self, report_type: str, session_factory: Callable[[], Session], output: Optional[BinaryIO] = None, progress_callback: Optional[Callable[[float], None]] = None, versions: Optional[Dict[str, Any]] = None, data_time: Optional[float] = None) -> BinaryIO:
+        """Load the data a report needs and render it"""
+        if report_type == "objects":
+            # A single query, so it streams straight from the cursor into the layout
+            db = session_factory()
+            try:
+                db_service = DatabaseService(db)
+                return self.generate_objects_report(db_service.iter_report_objects(), output, progress_callback, db_service.count_objects())
+            finally:
+                db.close()
+
+        data = self.load_report_data(report_type, session_factory)
+        if report_type == "relations":
+            return self.generate_relations_report(data["relations"], data["objects"], output, progress_callback)
+        if report_type == "hierarchies":
+            return self.generate_hierarchies_report(data["hierarchies"], data["objects"], output, progress_callback)
+        objects, relations, hierarchies = data["objects"], data["relations"], data["hierarchies"]
+        if PdfWriter is not None and (
+            (self.cache is not None and versions is not None)
+            or self._use_process_pool(len(objects) + len(relations) + len(hierarchies))
+        ):
+            return self.generate_full_report_stitched(objects, relations, hierarchies, output, progress_callback, versions, data_time)
+        return self.generate_full_report(objects, relations, hierarchies, output, progress_callback)
+
+    def load_report_data(self, report_type: str, session_factory: Callable[[], Session]) -> Dict[str, List[Any]]:
+        """Run the report's data plan, one session per query so independent queries overlap.
+
+        Every session reads the snapshot exported by a coordinating session, so a write
+        committed mid-load can't leave relations naming objects the report never loaded.
+        """
+        plan = REPORT_DATA_PLANS[report_type]
+
+        def fetch(query: Callable[[DatabaseService], Iterable[Any]], snapshot_id: str) -> List[Any]:
+            db = session_factory()
+            try:
+                db_service = DatabaseService(db)
+                db_service.use_read_snapshot(snapshot_id)
+                return list(query(db_service))
+            finally:
+                db.close()
 
-        # Title
-        story.append(Paragraph("Object Design System - Objects Report", self.title_style))
-        story.append(Paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", self.normal_style))
-        story.append(Spacer(1, 30))
+        # The exporting transaction stays open until every worker has imported its snapshot
+        coordinator = session_factory()
+        try:
+            snapshot_id = DatabaseService(coordinator).export_snapshot()
+            with ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix="report-data") as executor:
+                futures = {name: executor.submit(fetch, query, snapshot_id) for name, query in plan.items()}
+                return {name: future.result() for name, future in futures.items()}
+        finally:
+            coordinator.close()
 
-        if not objects:
-            story.append(Paragraph("No objects found.", self.normal_style))
-        else:
+    def generate_objects_report(self, objects: Iterable[Any], output: Optional[BinaryIO] = None, progress_callback: Optional[Callable[[float], None]] = None, total: Optional[int] = None) -> BinaryIO:
+        """Generate PDF report for objects (rows from DatabaseService.iter_report_objects)"""
+        if total is None:
+            objects = list(objects)
+            total = len(objects)
+
+        def groups():
+            yield self._title_group("Object Design System - Objects Report")
+            if not total:
+                yield [Paragraph("No objects found.", self.normal_style)]
+                return
             for i, obj in enumerate(objects, 1):
-                story.append(Paragraph(f"{i}. {obj.name}", self.heading_style))
-                story.append(Paragraph(f"Type: {obj.type}", self.normal_style))
+                group = [
+                    Paragraph(f"{i}. {obj.name}", self.heading_style),
+                    Paragraph(f"Type: {obj.type}", self.normal_style),
+                ]
                 if obj.description:
-                    story.append(Paragraph(f"Description: {obj.description}", self.normal_style))
+                    group.append(Paragraph(f"Description: {obj.description}", self.normal_style))
                 if obj.attributes:
-                    story.append(Paragraph(f"Attributes: {obj.attributes}", self.normal_style))
-                if obj.tables:
-                    story.append(Paragraph("Tables:", self.normal_style))
-                    for table in obj.tables:
-                        story.append(Paragraph(f"  • {table['name']}", self.normal_style))
-                story.append(Spacer(1, 20))
+                    group.append(Paragraph(f"Attributes: {obj.attributes}", self.normal_style))
+                if obj.table_names:
+                    group.append(Paragraph("Tables:", self.normal_style))
+                    for table_name in obj.table_names:
+                        group.append(Paragraph(f"  • {table_name}", self.normal_style))
+                group.append(Spacer(1, 20))
+                yield group
 
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return self._render(output, groups(), total + 1, progress_callback)
 
-    def generate_relations_report(self, relations: List[Relation], objects: List[ObjectType]) -> BytesIO:
+    def generate_relations_report(self, relations: List[Relation], objects: List[ObjectType], output: Optional[BinaryIO] = None, progress_callback: Optional[Callable[[float], None]] = None) -> BinaryIO:
         """Generate PDF report for relations"""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, margins=[50, 50, 50, 50])
-        story = []
-
-        # Title
-        story.append(Paragraph("Object Design System - Relations Report", self.title_style))
-        story.append(Paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", self.normal_style))
-        story.append(Spacer(1, 30))
-
-        if not relations:
-            story.append(Paragraph("No relations found.", self.normal_style))
-        else:
+        def groups():
+            yield self._title_group("Object Design System - Relations Report")
+            if not relations:
+                yield [Paragraph("No relations found.", self.normal_style)]
+                return
+            object_index = build_object_index(objects)
             for i, relation in enumerate(relations, 1):
                 # Find primary object name
-                primary_obj = next((obj for obj in objects if obj.id == relation.primary_object_id), None)
+                primary_obj = object_index.get(normalize_id(relation.primary_object_id))
                 primary_name = primary_obj.name if primary_obj else "Unknown"
                 
-                story.append(Paragraph(f"{i}. {primary_name} → {relation.relation_type.replace('_', ' ')}", self.heading_style))
+                group = [Paragraph(f"{i}. {primary_name} → {relation.relation_type.replace('_', ' ')}", self.heading_style)]
                 
                 if relation.secondary_object_ids:
-                    story.append(Paragraph("Related Objects:", self.normal_style))
+                    group.append(Paragraph("Related Objects:", self.normal_style))
                     for obj_id in relation.secondary_object_ids:
-                        related_obj = next((obj for obj in objects if obj.id == obj_id), None)
+                        related_obj = object_index.get(normalize_id(obj_id))
                         related_name = related_obj.name if related_obj else "Unknown"
                         related_type = related_obj.type if related_obj else "Unknown"
-                        story.append(Paragraph(f"  • {related_name} ({related_type})", self.normal_style))
+                        group.append(Paragraph(f"  • {related_name} ({related_type})", self.normal_style))
                 
                 if relation.description:
-                    story.append(Paragraph(f"Description: {relation.description}", self.normal_style))
-                story.append(Spacer(1, 20))
+                    group.append(Paragraph(f"Description: {relation.description}", self.normal_style))
+                group.append(Spacer(1, 20))
+                yield group
 
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return self._render(output, groups(), len(relations) + 1, progress_callback)
 
-    def generate_hierarchies_report(self, hierarchies: List[Hierarchy], objects: List[ObjectType]) -> BytesIO:
+    def generate_hierarchies_report(self, hierarchies: List[Hierarchy], objects: List[ObjectType], output: Optional[BinaryIO] = None, progress_callback: Optional[Callable[[float], None]] = None) -> BinaryIO:
         """Generate PDF report for hierarchies"""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, margins=[50, 50, 50, 50])
-        story = []
-
-        # Title
-        story.append(Paragraph("Object Design System - Hierarchies Report", self.title_style))
-        story.append(Paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", self.normal_style))
-        story.append(Spacer(1, 30))
-
-        if not hierarchies:
-            story.append(Paragraph("No hierarchies found.", self.normal_style))
-        else:
-            # Group hierarchies by parent
-            parent_groups = {}
-            for hierarchy in hierarchies:
-                parent_id = str(hierarchy.parent_object_id) if hierarchy.parent_object_id else "root"
-                if parent_id not in parent_groups:
-                    parent_groups[parent_id] = []
-                parent_groups[parent_id].append(hierarchy)
+        parent_groups = group_by_parent(hierarchies)
 
+        def groups():
+            yield self._title_group("Object Design System - Hierarchies Report")
+            if not hierarchies:
+                yield [Paragraph("No hierarchies found.", self.normal_style)]
+                return
+            object_index = build_object_index(objects)
             for parent_id, hierarchy_list in parent_groups.items():
-                if parent_id == "root":
+                if parent_id is None:
                     parent_name = "Root Level"
                 else:
-                    parent_obj = next((obj for obj in objects if str(obj.id) == parent_id), None)
+                    parent_obj = object_index.get(parent_id)
                     parent_name = parent_obj.name if parent_obj else "Unknown"
                 
-                story.append(Paragraph(f"Parent: {parent_name}", self.heading_style))
+                group = [Paragraph(f"Parent: {parent_name}", self.heading_style)]
                 
                 for hierarchy in hierarchy_list:
                     if hierarchy.child_object_ids:
-                        story.append(Paragraph(f"Level {hierarchy.level or 1} Children:", self.normal_style))
+                        group.append(Paragraph(f"Level {hierarchy.level or 1} Children:", self.normal_style))
                         for child_id in hierarchy.child_object_ids:
-                            child_obj = next((obj for obj in objects if str(obj.id) == child_id), None)
+                            child_obj = object_index.get(normalize_id(child_id))
                             child_name = child_obj.name if child_obj else "Unknown"
                             child_type = child_obj.type if child_obj else "Unknown"
-                            story.append(Paragraph(f"  • {child_name} ({child_type})", self.normal_style))
-                story.append(Spacer(1, 20))
+                            group.append(Paragraph(f"  • {child_name} ({child_type})", self.normal_style))
+                group.append(Spacer(1, 20))
+                yield group
+
+        return self._render(output, groups(), len(parent_groups) + 1, progress_callback)
+
+    def generate_full_report(self, objects: List[ObjectType], relations: List[Relation], hierarchies: List[Hierarchy], output: Optional[BinaryIO] = None, progress_callback: Optional[Callable[[float], None]] = None) -> BinaryIO:
+        """Generate comprehensive PDF report"""
+        rows = self.full_report_rows(objects, relations, hierarchies)
+
+        def groups():
+            yield self._title_group("Object Design System - Complete Report")
+            for section, title in FULL_REPORT_SECTIONS:
+                yield from self._section_groups(section, title, rows[section])
+                yield [Spacer(1, 30)]
+
+            # Footer
+            yield [Paragraph("Generated by Object Design System", self.normal_style)]
 
+        total_groups = sum(len(section_rows) + 2 for section_rows in rows.values()) + 2
+        return self._render(output, groups(), total_groups, progress_callback)
+
+    def _title_group(self, title: str) -> List[Any]:
+        return [
+            Paragraph(title, self.title_style),
+            Paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", self.normal_style),
+            Spacer(1, 30),
+        ]
+
+    def _render(self, output: Optional[BinaryIO], groups: Iterator[List[Any]], total_groups: int, progress_callback: Optional[Callable[[float], None]] = None) -> BinaryIO:
+        """Lay out story groups as they are produced and write the PDF to output"""
+        # Large reports spill to disk instead of growing an in-memory buffer
+        buffer = output if output is not None else tempfile.SpooledTemporaryFile(max_size=settings.report_spool_max_bytes)
+        doc = SimpleDocTemplate(buffer, pagesize=A4, margins=[50, 50, 50, 50])
+        story = LazyStory(groups)
+
+        if progress_callback:
+            def on_progress(kind: str, value: int):
+                if kind == 'PROGRESS':
+                    progress_callback(min(story.groups_consumed / max(total_groups, 1), 1.0))
+
+            doc.setProgressCallBack(on_progress)
         doc.build(story)
         buffer.seek(0)
         return buffer
 
-    def generate_full_report(self, objects: List[ObjectType], relations: List[Relation], hierarchies: List[Hierarchy]) -> BytesIO:
-        """Generate comprehensive PDF report"""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, margins=[50, 50, 50, 50])
-        story = []
+    def generate_full_report_stitched(self, objects: List[ObjectType], relations: List[Relation], hierarchies: List[Hierarchy], output: Optional[BinaryIO] = None, progress_callback: Optional[Callable[[float], None]] = None, versions: Optional[Dict[str, Any]] = None, data_time: Optional[float] = None) -> BinaryIO:
+        """Render full-report sections as separate PDFs and stitch them into one.
 
-        # Title
-        story.append(Paragraph("Object Design System - Complete Report", self.title_style))
-        story.append(Paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", self.normal_style))
-        story.append(Spacer(1, 30))
+        Sections whose data version is unchanged are reused from the cache; the
+        rest are rendered in chunks, on the process pool for large reports.
+        data_time is when versions were read, and defaults to now.
+        """
+        buffer = output if output is not None else tempfile.SpooledTemporaryFile(max_size=settings.report_spool_max_bytes)
 
-        # Objects section
-        story.append(Paragraph("OBJECTS", self.heading_style))
-        if objects:
-            for i, obj in enumerate(objects, 1):
-                story.append(Paragraph(f"{i}. {obj.name} ({obj.type})", self.styles['Heading3']))
-                if obj.description:
-                    story.append(Paragraph(f"Description: {obj.description}", self.normal_style))
-                story.append(Spacer(1, 10))
-        else:
-            story.append(Paragraph("No objects found.", self.normal_style))
-        
-        story.append(Spacer(1, 30))
-
-        # Relations section
-        story.append(Paragraph("RELATIONS", self.heading_style))
-        if relations:
-            for i, relation in enumerate(relations, 1):
-                primary_obj = next((obj for obj in objects if obj.id == relation.primary_object_id), None)
-                primary_name = primary_obj.name if primary_obj else "Unknown"
-                story.append(Paragraph(f"{i}. {primary_name} → {relation.relation_type.replace('_', ' ')}", self.styles['Heading3']))
-                if relation.description:
-                    story.append(Paragraph(f"Description: {relation.description}", self.normal_style))
-                story.append(Spacer(1, 10))
-        else:
-            story.append(Paragraph("No relations found.", self.normal_style))
-        
-        story.append(Spacer(1, 30))
-
-        # Hierarchies section
-        story.append(Paragraph("HIERARCHIES", self.heading_style))
-        if hierarchies:
-            parent_groups = {}
-            for hierarchy in hierarchies:
-                parent_id = str(hierarchy.parent_object_id) if hierarchy.parent_object_id else "root"
-                if parent_id not in parent_groups:
-                    parent_groups[parent_id] = []
-                parent_groups[parent_id].append(hierarchy)
+        with tempfile.TemporaryDirectory(prefix="report-") as tmp_dir:
+            fragments = {}
+            if self.cache is not None and versions is not None:
+                for section, _ in FULL_REPORT_SECTIONS:
+                    fragments[section] = self.cache.get(f"section-{section}", section_version(section, versions))
+            pending = [(section, title) for section, title in FULL_REPORT_SECTIONS if not fragments.get(section)]
 
-            for parent_id, hierarchy_list in parent_groups.items():
-                if parent_id == "root":
-                    parent_name = "Root Level"
+            if pending:
+                rows = self.full_report_rows(objects, relations, hierarchies)
+
+                # (section, heading for the first chunk only, rows, first row number, footer)
+                chunks = []
+                chunk_rows = settings.report_chunk_rows
+                for section, title in pending:
+                    section_rows = rows[section]
+                    for start in range(0, max(len(section_rows), 1), chunk_rows):
+                        footer = section == FULL_REPORT_SECTIONS[-1][0] and start + chunk_rows >= len(section_rows)
+                        chunks.append((section, title if start == 0 else None, section_rows[start:start + chunk_rows], start + 1, footer))
+                paths = [os.path.join(tmp_dir, f"chunk-{n}.pdf") for n in range(len(chunks))]
+
+                if self._use_process_pool(sum(len(rows[section]) for section, _ in pending)):
+                    pool = self._get_process_pool()
+                    futures = [pool.submit(render_section_chunk, *chunk, path) for chunk, path in zip(chunks, paths)]
+                    results = (future.result() for future in futures)
                 else:
-                    parent_obj = next((obj for obj in objects if str(obj.id) == parent_id), None)
-                    parent_name = parent_obj.name if parent_obj else "Unknown"
-                
-                story.append(Paragraph(f"Parent: {parent_name}", self.styles['Heading3']))
-                for hierarchy in hierarchy_list:
-                    if hierarchy.child_object_ids:
-                        for child_id in hierarchy.child_object_ids:
-                            child_obj = next((obj for obj in objects if str(obj.id) == child_id), None)
-                            child_name = child_obj.name if child_obj else "Unknown"
-                            story.append(Paragraph(f"  • {child_name}", self.normal_style))
-                story.append(Spacer(1, 10))
-        else:
-            story.append(Paragraph("No hierarchies found.", self.normal_style))
+                    results = (render_section_chunk(*chunk, path) for chunk, path in zip(chunks, paths))
+                for done, _ in enumerate(results, 1):
+                    if progress_callback:
+                        progress_callback(0.9 * done / len(chunks))
 
-        # Footer
-        story.append(Spacer(1, 30))
-        story.append(Paragraph("Generated by Object Design System", self.normal_style))
+                for section, _ in pending:
+                    fragment_path = os.path.join(tmp_dir, f"{section}.pdf")
+                    writer = PdfWriter()
+                    for chunk, path in zip(chunks, paths):
+                        if chunk[0] == section:
+                            writer.append(path)
+                    writer.write(fragment_path)
+                    if self.cache is not None and versions is not None:
+                        fragment_path = self.cache.put(
+                            f"section-{section}", section_version(section, versions), fragment_path,
+                            data_time if data_time is not None else time.time()
+                        )
+                    fragments[section] = fragment_path
 
-        doc.build(story)
+            page_counts = {section: len(PdfReader(fragments[section]).pages) for section, _ in FULL_REPORT_SECTIONS}
+
+            # Contents page numbers depend on how long the contents page itself is
+            toc_path = os.path.join(tmp_dir, "contents.pdf")
+            toc_pages = 1
+            while True:
+                section_starts = {}
+                page = toc_pages + 1
+                for section, _ in FULL_REPORT_SECTIONS:
+                    section_starts[section] = page
+                    page += page_counts[section]
+                rendered_pages = self._render_contents(toc_path, section_starts)
+                if rendered_pages == toc_pages:
+                    break
+                toc_pages = rendered_pages
+
+            writer = PdfWriter()
+            writer.append(toc_path)
+            for section, title in FULL_REPORT_SECTIONS:
+                writer.append(fragments[section])
+                writer.add_outline_item(title.title(), section_starts[section] - 1)
+
+            # Stamp "Page X of N" now that the final page count is known
+            overlay = PdfReader(self._page_number_overlay(len(writer.pages)))
+            for page, number_page in zip(writer.pages, overlay.pages):
+                page.merge_page(number_page)
+
+            writer.write(buffer)
+
+        if progress_callback:
+            progress_callback(1.0)
         buffer.seek(0)
         return buffer
+
+    def full_report_rows(self, objects: List[ObjectType], relations: List[Relation], hierarchies: List[Hierarchy]) -> Dict[str, List[tuple]]:
+        """Plain (picklable) rows for each full-report section, with names already resolved"""
+        object_index = build_object_index(objects)
+
+        def name_of(obj_id: Any) -> str:
+            obj = object_index.get(normalize_id(obj_id))
+            return obj.name if obj else "Unknown"
+
+        return {
+            "objects": [(obj.name, obj.type, obj.description) for obj in objects],
+            "relations": [
+                (name_of(relation.primary_object_id), relation.relation_type.replace('_', ' '), relation.description)
+                for relation in relations
+            ],
+            "hierarchies": [
+                (
+                    "Root Level" if parent_id is None else name_of(parent_id),
+                    [name_of(child_id) for hierarchy in hierarchy_list for child_id in hierarchy.child_object_ids or []]
+                )
+                for parent_id, hierarchy_list in group_by_parent(hierarchies).items()
+            ],
+        }
+
+    def _section_groups(self, section: str, title: Optional[str], rows: List[tuple], start: int = 1) -> Iterator[List[Any]]:
+        if title:
+            heading = [Paragraph(title, self.heading_style)]
+            if not rows:
+                heading.append(Paragraph(f"No {section} found.", self.normal_style))
+            yield heading
+
+        for i, row in enumerate(rows, start):
+            if section == "objects":
+                name, object_type, description = row
+                group = [Paragraph(f"{i}. {name} ({object_type})", self.styles['Heading3'])]
+                if description:
+                    group.append(Paragraph(f"Description: {description}", self.normal_style))
+            elif section == "relations":
+                primary_name, relation_type, description = row
+                group = [Paragraph(f"{i}. {primary_name} → {relation_type}", self.styles['Heading3'])]
+                if description:
+                    group.append(Paragraph(f"Description: {description}", self.normal_style))
+            else:
+                parent_name, child_names = row
+                group = [Paragraph(f"Parent: {parent_name}", self.styles['Heading3'])]
+                for child_name in child_names:
+                    group.append(Paragraph(f"  • {child_name}", self.normal_style))
+            group.append(Spacer(1, 10))
+            yield group
+
+    def _render_contents(self, path: str, section_starts: Dict[str, int]) -> int:
+        doc = SimpleDocTemplate(path, pagesize=A4, margins=[50, 50, 50, 50])
+        story = [
+            Paragraph("Object Design System - Complete Report", self.title_style),
+            Paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", self.normal_style),
+            Spacer(1, 30),
+            Paragraph("Contents", self.heading_style),
+        ]
+        for section, title in FULL_REPORT_SECTIONS:
+            story.append(Paragraph(f"{title.title()} — page {section_starts[section]}", self.normal_style))
+        doc.build(story)
+        return doc.page
+
+    def _page_number_overlay(self, page_count: int) -> BytesIO:
+        overlay = BytesIO()
+        canv = canvas.Canvas(overlay, pagesize=A4)
+        width, _ = A4
+        for number in range(1, page_count + 1):
+            canv.setFont("Helvetica", 9)
+            canv.drawCentredString(width / 2, 25, f"Page {number} of {page_count}")
+            canv.showPage()
+        canv.save()
+        overlay.seek(0)
+        return overlay
+
+    def _use_process_pool(self, row_count: int) -> bool:
+        return settings.report_render_processes > 1 and row_count >= settings.report_parallel_min_rows
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._process_pool is None:
+                # spawn, not fork: the server process has live threads and DB connections
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=settings.report_render_processes,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+
+_worker_report_service: Optional[ReportService] = None
+
+
+def render_section_chunk(section: str, title: Optional[str], rows: List[tuple], start: int, footer: bool, path: str) -> int:
+    """Process-pool entry point: render one chunk of a report section to its own PDF, returning its page count"""
+    global _worker_report_service
+    if _worker_report_service is None:
+        _worker_report_service = ReportService()
+    service = _worker_report_service
+
+    def groups():
+        yield from service._section_groups(section, title, rows, start)
+        if footer:
+            yield [Spacer(1, 30), Paragraph("Generated by Object Design System", service.normal_style)]
+
+    doc = SimpleDocTemplate(path, pagesize=A4, margins=[50, 50, 50, 50])
+    doc.build(LazyStory(groups()))
+    return doc.page
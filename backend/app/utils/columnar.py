@@ -0,0 +1,192 @@
+"""Columnar binary encoding for object table rows.
+
+Layout: MAGIC, a little-endian uint32 header length, a JSON header, then
+one zlib-compressed chunk per (row group, column). Columns are typed from
+their values (int, float, bool, str, json); str chunks are dictionary
+encoded when values repeat. Reading a row range with a column projection
+only decompresses the chunks it touches.
+"""
+
+from array import array
+from typing import List, Any, Optional, Dict, Tuple
+import json
+import struct
+import sys
+import zlib
+
+
+MAGIC = b"ODC1"
+GROUP_ROWS = 4096
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _column_type(values: List[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if not present:
+        return "json"
+    if all(isinstance(value, bool) for value in present):
+        return "bool"
+    if all(isinstance(value, int) and not isinstance(value, bool) and INT64_MIN <= value <= INT64_MAX for value in present):
+        return "int"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return "float"
+    if all(isinstance(value, str) for value in present):
+        return "str"
+    return "json"
+
+
+def _pack_array(typecode: str, values: List[Any]) -> bytes:
+    packed = array(typecode, values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_array(typecode: str, data: bytes) -> List[Any]:
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if sys.byteorder != "little":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+def _pack_strings(values: List[str]) -> bytes:
+    encoded = [value.encode() for value in values]
+    return _pack_array("I", [len(value) for value in encoded]) + b"".join(encoded)
+
+
+def _unpack_strings(data: bytes, count: int) -> Tuple[List[str], int]:
+    """Strings and the offset just past them"""
+    lengths = _unpack_array("I", data[:4 * count])
+    values = []
+    position = 4 * count
+    for length in lengths:
+        values.append(bytes(data[position:position + length]).decode())
+        position += length
+    return values, position
+
+
+def _encode_chunk(column_type: str, values: List[Any]) -> Tuple[bytes, str]:
+    """(payload, layout) for one column of one row group; layout records how the payload was built"""
+    if column_type == "json":
+        return json.dumps(values, separators=(",", ":")).encode(), ""
+
+    nulls = [value is None for value in values]
+    has_nulls = any(nulls)
+    # Null mask first, one byte per row, only when the chunk has nulls
+    prefix = bytes(nulls) if has_nulls else b""
+    layout = "n" if has_nulls else ""
+
+    if column_type == "int":
+        return prefix + _pack_array("q", [0 if value is None else value for value in values]), layout
+    if column_type == "float":
+        return prefix + _pack_array("d", [0.0 if value is None else float(value) for value in values]), layout
+    if column_type == "bool":
+        return prefix + bytes(bool(value) for value in values), layout
+    if column_type == "str":
+        strings = ["" if value is None else value for value in values]
+        distinct = list(dict.fromkeys(strings))
+        if len(distinct) * 2 <= len(strings):
+            codes = {value: code for code, value in enumerate(distinct)}
+            typecode = "H" if len(distinct) <= 0xFFFF else "I"
+            payload = struct.pack("<I", len(distinct)) + _pack_strings(distinct) + _pack_array(typecode, [codes[value] for value in strings])
+            return prefix + payload, layout + "d" + typecode
+        return prefix + _pack_strings(strings), layout
+
+
+def _decode_chunk(column_type: str, layout: str, data: bytes, count: int) -> List[Any]:
+    if column_type == "json":
+        return json.loads(data)
+
+    nulls = None
+    if layout.startswith("n"):
+        nulls, data, layout = data[:count], data[count:], layout[1:]
+
+    if column_type == "int":
+        values = _unpack_array("q", data)
+    elif column_type == "float":
+        values = _unpack_array("d", data)
+    elif column_type == "bool":
+        values = [bool(byte) for byte in data]
+    elif column_type == "str" and layout.startswith("d"):
+        dictionary_size = struct.unpack_from("<I", data)[0]
+        dictionary, end = _unpack_strings(data[4:], dictionary_size)
+        values = [dictionary[code] for code in _unpack_array(layout[1], data[4 + end:])]
+    else:
+        values, _ = _unpack_strings(data, count)
+
+    if nulls:
+        values = [None if is_null else value for value, is_null in zip(values, nulls)]
+    return values
+
+
+def encode_table(rows: List[List[Any]], column_names: List[str], group_rows: int = GROUP_ROWS) -> bytes:
+    width = max([len(column_names)] + [len(row) for row in rows])
+    names = list(column_names) + [f"column_{index + 1}" for index in range(len(column_names), width)]
+    columns = [[row[index] if index < len(row) else None for row in rows] for index in range(width)]
+    types = [_column_type(values) for values in columns]
+
+    chunks = []
+    groups = []
+    offset = 0
+    for start in range(0, len(rows), group_rows):
+        group = []
+        for column_type, values in zip(types, columns):
+            payload, layout = _encode_chunk(column_type, values[start:start + group_rows])
+            compressed = zlib.compress(payload, 6)
+            chunks.append(compressed)
+            group.append([offset, len(compressed), layout])
+            offset += len(compressed)
+        groups.append(group)
+
+    header = json.dumps({
+        "rows": len(rows),
+        "group_rows": group_rows,
+        "columns": [{"name": name, "type": column_type} for name, column_type in zip(names, types)],
+        "groups": groups,
+    }, separators=(",", ":")).encode()
+    return MAGIC + struct.pack("<I", len(header)) + header + b"".join(chunks)
+
+
+class ColumnarTable:
+    """Read access to an encode_table() blob without decoding the whole table"""
+
+    def __init__(self, data: bytes):
+        if data[:4] != MAGIC:
+            raise ValueError("Not a columnar table encoding")
+        header_length = struct.unpack_from("<I", data, 4)[0]
+        self._header: Dict[str, Any] = json.loads(data[8:8 + header_length])
+        self._data = memoryview(data)[8 + header_length:]
+
+    @property
+    def row_count(self) -> int:
+        return self._header["rows"]
+
+    @property
+    def column_names(self) -> List[str]:
+        return [column["name"] for column in self._header["columns"]]
+
+    def read(self, offset: int = 0, limit: Optional[int] = None, columns: Optional[List[int]] = None) -> List[List[Any]]:
+        """Rows [offset, offset + limit) with only the given column positions, in the order given"""
+        width = len(self._header["columns"])
+        indexes = list(range(width)) if columns is None else columns
+        end = self.row_count if limit is None else min(self.row_count, offset + limit)
+        if offset >= end:
+            return []
+
+        group_rows = self._header["group_rows"]
+        projected = [[] for _ in indexes]
+        for group_index in range(offset // group_rows, (end - 1) // group_rows + 1):
+            group_start = group_index * group_rows
+            count = min(group_rows, self.row_count - group_start)
+            low, high = max(offset - group_start, 0), min(end - group_start, count)
+            for position, column_index in enumerate(indexes):
+                if column_index >= width:
+                    # Column added after the table was encoded
+                    projected[position].extend([None] * (high - low))
+                    continue
+                chunk_offset, chunk_length, layout = self._header["groups"][group_index][column_index]
+                payload = zlib.decompress(self._data[chunk_offset:chunk_offset + chunk_length])
+                column_type = self._header["columns"][column_index]["type"]
+                projected[position].extend(_decode_chunk(column_type, layout, payload, count)[low:high])
+        return [list(row) for row in zip(*projected)] if indexes else [[] for _ in range(end - offset)]
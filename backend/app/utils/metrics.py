@@ -0,0 +1,41 @@
+from collections import Counter, deque
+from typing import Dict, Any
+import threading
+
+
+class LatencyStats:
+    """In-process counters and a rolling latency window for one endpoint"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._latencies = deque(maxlen=window)
+
+    def record(self, latency_ms: float, outcome: str = "ok") -> None:
+        with self._lock:
+            self._counts["total"] += 1
+            self._counts[outcome] += 1
+            self._latencies.append(latency_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "counts": counts,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+        }
+
+
+search_stats = LatencyStats()
@@ -0,0 +1,29 @@
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+import os
+
+
+class SendfileResponse(FileResponse):
+    """FileResponse that lets the server sendfile() the body when it supports the ASGI zero-copy extension.
+
+    Other servers get Starlette's regular chunked read, which streams the file
+    in fixed-size chunks, so memory stays flat either way.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.send_header_only or "http.response.zerocopysend" not in scope.get("extensions", {}):
+            await super().__call__(scope, receive, send)
+            return
+
+        with open(self.path, "rb") as file:
+            # Stat the open handle so a concurrent cache replace can't mismatch headers and body
+            self.set_stat_headers(os.fstat(file.fileno()))
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            await send({"type": "http.response.zerocopysend", "file": file})
+
+        if self.background is not None:
+            await self.background()
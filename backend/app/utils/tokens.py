@@ -0,0 +1,5 @@
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for prompt budgeting (~4 characters per token)"""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
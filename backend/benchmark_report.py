@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Time the relations, hierarchies and full reports over catalogs of growing size.
+
+Each catalog has one relation and one hierarchy per object, in the shape the
+report data plans load. Prints seconds per report and milliseconds per
+object; per-object time staying flat as the catalog grows means rendering
+scales linearly. Needs no database.
+Usage: benchmark_report.py [objects ...]  (default 1000 10000 100000)
+"""
+import sys
+import tempfile
+import time
+import uuid
+from types import SimpleNamespace
+from app.services.report_service import ReportService
+
+TYPES = ["Item", "Document"]
+
+def generate_catalog(size: int) -> tuple:
+    """Objects, relations pointing each object at the next two, and hierarchies parenting the next one"""
+    object_ids = [uuid.UUID(int=n + 1) for n in range(size)]
+    objects = [
+        SimpleNamespace(id=object_id, name=f"Object {n}", type=TYPES[n % 2], description=f"Generated object {n}")
+        for n, object_id in enumerate(object_ids)
+    ]
+    relations = [
+        SimpleNamespace(id=uuid.uuid4(), primary_object_id=object_id, relation_type=f"Relation_{n % 20}",
+                        secondary_object_ids=[str(object_ids[(n + 1) % size]), str(object_ids[(n + 2) % size])],
+                        description=None)
+        for n, object_id in enumerate(object_ids)
+    ]
+    hierarchies = [
+        SimpleNamespace(id=uuid.uuid4(), parent_object_id=object_id, child_object_ids=[str(object_ids[(n + 1) % size])], level=1)
+        for n, object_id in enumerate(object_ids)
+    ]
+    return objects, relations, hierarchies
+
+def timed(render) -> float:
+    with tempfile.TemporaryFile() as output:
+        started = time.perf_counter()
+        render(output)
+        return time.perf_counter() - started
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or [1000, 10000, 100000]
+    report_service = ReportService()
+    reports = {
+        "relations": lambda catalog, output: report_service.generate_relations_report(catalog[1], catalog[0], output),
+        "hierarchies": lambda catalog, output: report_service.generate_hierarchies_report(catalog[2], catalog[0], output),
+        "full": lambda catalog, output: report_service.generate_full_report(catalog[0], catalog[1], catalog[2], output),
+    }
+    print(f"{'report':<12} {'objects':>8} {'seconds':>9} {'ms/object':>10}")
+    for size in sizes:
+        catalog = generate_catalog(size)
+        for name, render in reports.items():
+            seconds = timed(lambda output: render(catalog, output))
+            print(f"{name:<12} {size:>8} {seconds:>9.2f} {seconds * 1000 / size:>10.3f}")
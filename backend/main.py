@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.routes import router, integrity_sweeper
 from app.core.config import settings
 import os
 
@@ -22,6 +22,16 @@ app.add_middleware(
 # Include API routes
 app.include_router(router, prefix="/api")
 
+# Background repair of references to deleted objects
+@app.on_event("startup")
+def start_integrity_sweeper():
+    if settings.integrity_sweep_interval_seconds > 0:
+        integrity_sweeper.start()
+
+@app.on_event("shutdown")
+def stop_integrity_sweeper():
+    integrity_sweeper.stop()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,37 @@
+from sqlalchemy.orm import Session
+import os
+import pytest
+
+
+@pytest.fixture(scope="module")
+def pg_connection():
+    """Connection on DATABASE_URL inside a transaction rolled back after the module's tests"""
+    if not os.getenv("DATABASE_URL", "").startswith("postgresql"):
+        pytest.skip("needs DATABASE_URL pointing at a migrated Postgres database")
+    from app.db.base import engine
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    try:
+        yield connection
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def pg_session():
+    """Session on DATABASE_URL whose commits become savepoints of a transaction rolled back afterwards"""
+    if not os.getenv("DATABASE_URL", "").startswith("postgresql"):
+        pytest.skip("needs DATABASE_URL pointing at a migrated Postgres database")
+    from app.db.base import engine
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
@@ -0,0 +1,136 @@
+from datetime import datetime
+from types import SimpleNamespace
+from app.services.ai_service import AIService
+from app.services.database import DatabaseService
+from app.services.llm_provider import LLMProvider
+from app.core.config import settings
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+
+def make_object(n: int):
+    return SimpleNamespace(id=uuid.UUID(int=n + 1), name=f"Valve {n}", description="Gate valve", type="Item",
+                           attributes={}, tables=[], created_date=datetime(2026, 1, 1),
+                           modified_date=datetime(2026, 1, 1), revision=1)
+
+
+class ScriptedProvider(LLMProvider):
+    def __init__(self, answer=None, error=None):
+        self.answer = answer
+        self.error = error
+
+    def complete(self, messages, json_mode=False, timeout=None):
+        if self.error:
+            raise self.error
+        return json.dumps(self.answer)
+
+
+class FallbackDatabase:
+    """The request's DatabaseService; only the full-text fallback should touch it"""
+
+    def rank_objects_fulltext(self, terms, limit):
+        return [(make_object(7), 0.5)]
+
+
+class ClosingSession:
+    def close(self):
+        pass
+
+
+def run_search(provider, load_seconds, deadline_ms, monkeypatch):
+    def get_objects(self, conditions=None):
+        time.sleep(load_seconds)
+        return [make_object(n) for n in range(3)]
+
+    monkeypatch.setattr(DatabaseService, "get_objects", get_objects)
+    service = AIService(provider, ClosingSession)
+
+    async def search():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        started = time.monotonic()
+        response = await service.search_with_deadline("valve", FallbackDatabase(), deadline_ms)
+        elapsed = time.monotonic() - started
+        ticking.cancel()
+        return response, elapsed, ticks
+
+    return asyncio.run(search())
+
+
+def test_deadline_covers_catalog_load(monkeypatch):
+    response, elapsed, ticks = run_search(ScriptedProvider({"results": []}), 1.0, 100, monkeypatch)
+
+    assert response.degraded
+    assert response.degradedReason == "deadline_exceeded"
+    assert [result.object.name for result in response.results] == ["Valve 7"]
+    assert elapsed < 0.5
+    # The load ran off the event loop, so other coroutines kept running meanwhile
+    assert ticks >= 5
+
+
+def test_model_answer_within_deadline(monkeypatch):
+    answer = {"results": [{"object_id": str(uuid.UUID(int=2)), "relevance": 0.9, "reasoning": "name"}],
+              "query_analysis": "valves"}
+    response, _, _ = run_search(ScriptedProvider(answer), 0, 5000, monkeypatch)
+
+    assert not response.degraded
+    assert [(result.object.name, result.relevance) for result in response.results] == [("Valve 1", 0.9)]
+
+
+def test_model_error_falls_back(monkeypatch):
+    response, _, _ = run_search(ScriptedProvider(error=RuntimeError("down")), 0, 5000, monkeypatch)
+
+    assert response.degraded
+    assert response.degradedReason == "model_error"
+
+
+class SlowProvider(LLMProvider):
+    """Records how many completions run at once"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.running = 0
+        self.most_running = 0
+        self.lock = threading.Lock()
+
+    def complete(self, messages, json_mode=False, timeout=None):
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running -= 1
+        return json.dumps({"results": []})
+
+
+def test_timed_out_shards_keep_their_slot(monkeypatch):
+    # One object per shard, six shards, two slots, and a timeout well under the provider's latency
+    monkeypatch.setattr(settings, "search_shard_token_budget", 1)
+    monkeypatch.setattr(settings, "search_shard_concurrency", 2)
+    monkeypatch.setattr(settings, "search_shard_timeout", 0.05)
+    provider = SlowProvider(0.2)
+    objects = {str(make_object(n).id): make_object(n) for n in range(6)}
+    entries = {object_id: {"id": object_id} for object_id in objects}
+    service = AIService(provider, ClosingSession)
+
+    async def search():
+        try:
+            await service._map_reduce_search("valve", [[entry] for entry in entries.values()], entries)
+        except RuntimeError:
+            pass
+        # Let the abandoned calls drain
+        await asyncio.sleep(0.8)
+
+    asyncio.run(search())
+
+    assert provider.most_running == 2
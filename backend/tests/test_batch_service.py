@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from app.services.batch_service import run_batch, BatchOperationError
+from app.schemas.schemas import BatchOperation
+import pytest
+import uuid
+
+
+class RecordingDatabase:
+    """Stands in for DatabaseService: keeps rows in dicts and records commits and rollbacks"""
+
+    def __init__(self):
+        self.objects = {}
+        self.relations = {}
+        self.outcome = None
+
+    @contextmanager
+    def batch(self):
+        try:
+            yield
+        except Exception:
+            self.outcome = "rolled back"
+            raise
+        self.outcome = "committed"
+
+    def create_object(self, data):
+        row = SimpleNamespace(id=uuid.uuid4(), tables=[], created_date=datetime(2026, 1, 1),
+                              modified_date=datetime(2026, 1, 1), revision=1, **data.model_dump(exclude={"tables"}))
+        self.objects[row.id] = row
+        return row
+
+    def update_object(self, object_id, data):
+        row = self.objects.get(object_id)
+        if row:
+            for field, value in data.model_dump(exclude_unset=True).items():
+                setattr(row, field, value)
+        return row
+
+    def delete_object(self, object_id):
+        return self.objects.pop(object_id, None)
+
+    def create_relation(self, data):
+        row = SimpleNamespace(id=uuid.uuid4(), **data.model_dump())
+        self.relations[row.id] = row
+        return row
+
+
+def create_object(ref, name):
+    return BatchOperation(op="create", resource="objects", ref=ref,
+                          data={"name": name, "description": "", "type": "Item"})
+
+
+def test_refs_resolve_to_ids_created_earlier():
+    db_service = RecordingDatabase()
+    results = run_batch(db_service, [
+        create_object("pump", "Pump"),
+        create_object("tank", "Tank"),
+        BatchOperation(op="create", resource="relations",
+                       data={"primary_object_id": "$pump", "secondary_object_ids": ["$tank"], "relation_type": "Feeds"}),
+        BatchOperation(op="update", resource="objects", id="$tank", data={"name": "Buffer tank"}),
+    ])
+
+    pump_id, tank_id = results[0].id, results[1].id
+    relation = db_service.relations[results[2].id]
+    assert relation.primary_object_id == pump_id
+    assert relation.secondary_object_ids == [tank_id]
+    assert db_service.objects[tank_id].name == "Buffer tank"
+    assert [result.status for result in results] == [201, 201, 201, 200]
+    assert db_service.outcome == "committed"
+
+
+def test_unknown_ref_rolls_back_with_its_index():
+    db_service = RecordingDatabase()
+    with pytest.raises(BatchOperationError) as error:
+        run_batch(db_service, [
+            create_object("pump", "Pump"),
+            BatchOperation(op="delete", resource="objects", id="$tank"),
+        ])
+
+    assert (error.value.index, error.value.status_code) == (1, 400)
+    assert "$tank" in error.value.detail
+    assert db_service.outcome == "rolled back"
+
+
+def test_ref_used_before_its_create_is_unknown():
+    with pytest.raises(BatchOperationError) as error:
+        run_batch(RecordingDatabase(), [
+            BatchOperation(op="update", resource="objects", id="$pump", data={"name": "Pump"}),
+            create_object("pump", "Pump"),
+        ])
+
+    assert error.value.index == 0
+
+
+def test_missing_row_and_invalid_data():
+    with pytest.raises(BatchOperationError) as error:
+        run_batch(RecordingDatabase(), [BatchOperation(op="delete", resource="objects", id=str(uuid.uuid4()))])
+    assert error.value.status_code == 404
+
+    with pytest.raises(BatchOperationError) as error:
+        run_batch(RecordingDatabase(), [BatchOperation(op="create", resource="objects", data={"name": "Pump"})])
+    assert error.value.status_code == 422
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from app.services.database import DatabaseService
+from app.utils.columnar import encode_table, ColumnarTable
+import json
+
+
+ROWS = [
+    [n, f"PN-{n % 40}", ["Draft", "Released"][n % 2], n * 0.5, n % 3 == 0, None if n % 5 else {"revision": n}]
+    for n in range(1000)
+]
+COLUMNS = ["id", "part", "status", "weight", "approved", "notes"]
+
+
+def test_round_trip():
+    table = ColumnarTable(encode_table(ROWS, COLUMNS, group_rows=128))
+
+    assert table.row_count == 1000
+    assert table.column_names == COLUMNS
+    assert table.read() == ROWS
+
+
+def test_slice_with_projection_spans_row_groups():
+    table = ColumnarTable(encode_table(ROWS, COLUMNS, group_rows=128))
+
+    assert table.read(120, 20, [2, 0]) == [[row[2], row[0]] for row in ROWS[120:140]]
+    assert table.read(995, 100) == ROWS[995:]
+    assert table.read(1000, 10) == []
+
+
+def test_nulls_and_ragged_rows():
+    rows = [[1, "a"], [None, None, True], [3]]
+    table = ColumnarTable(encode_table(rows, ["n", "s"]))
+
+    assert table.column_names == ["n", "s", "column_3"]
+    assert table.read() == [[1, "a", None], [None, None, True], [3, None, None]]
+
+
+def test_table_rows_match_declared_columns():
+    rows = [[1, "a"], [None, None, True], [3]]
+    table = SimpleNamespace(columns=["n", "s"], encoded_data=encode_table(rows, ["n", "s"]))
+    db_service = DatabaseService(None)
+
+    assert db_service.get_object_table_rows(table, 0, 10) == [[1, "a"], [None, None], [3, None]]
+    assert db_service.get_object_table_rows(table, 1, 1, ["s"]) == [[None]]
+
+
+def test_smaller_than_row_json():
+    row_bytes = sum(len(json.dumps(row, separators=(",", ":"))) for row in ROWS)
+
+    assert len(encode_table(ROWS, COLUMNS)) * 2 < row_bytes
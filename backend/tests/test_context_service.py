@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from app.services.context_service import ContextBuilder
+from app.utils.tokens import estimate_tokens
+import uuid
+
+
+class CatalogStub:
+    """Stands in for DatabaseService over a catalog of pumps, each related to and parenting the next"""
+
+    def __init__(self, size: int):
+        self.objects = [
+            SimpleNamespace(id=uuid.UUID(int=n + 1), name=f"Pump {n}", type="Item",
+                            description="Centrifugal pump " * 40, attributes={"status": "Draft"})
+            for n in range(size)
+        ]
+        self.by_id = {obj.id: obj for obj in self.objects}
+        self.requested_limits = []
+
+    def _next(self, obj):
+        return self.objects[(self.objects.index(obj) + 1) % len(self.objects)]
+
+    def search_objects_by_terms(self, terms, limit):
+        self.requested_limits.append(limit)
+        return [obj for obj in self.objects if any(term in obj.name.lower() for term in terms)][:limit]
+
+    def get_relations_for_objects(self, object_ids):
+        return [SimpleNamespace(relation_type="Feeds", primary_object_id=object_id,
+                                secondary_object_ids=[str(self._next(self.by_id[object_id]).id)])
+                for object_id in object_ids]
+
+    def get_hierarchies_for_objects(self, object_ids):
+        return [SimpleNamespace(parent_object_id=object_id,
+                                child_object_ids=[str(self._next(self.by_id[object_id]).id)])
+                for object_id in object_ids]
+
+    def get_objects_by_ids(self, object_ids):
+        return [self.by_id[object_id] for object_id in object_ids if object_id in self.by_id]
+
+
+def test_context_stays_within_budget_as_catalog_grows():
+    builder = ContextBuilder(token_budget=1500, max_objects=10)
+    small, large = CatalogStub(50), CatalogStub(5000)
+
+    small_context = builder.build("Which pump feeds the tank?", small)
+    large_context = builder.build("Which pump feeds the tank?", large)
+
+    assert small.requested_limits == large.requested_limits == [10]
+    assert estimate_tokens(small_context) <= 1500
+    assert estimate_tokens(large_context) == estimate_tokens(small_context)
+
+
+def test_context_lists_matches_before_neighbours():
+    context = ContextBuilder(token_budget=100000, max_objects=3).build("pump", CatalogStub(20))
+    lines = context.split("\n")
+
+    assert [line.split('"name":"')[1].split('"')[0] for line in lines[:3]] == ["Pump 0", "Pump 1", "Pump 2"]
+    assert '"name":"Pump 3"' in lines[-1]
+
+
+def test_no_terms_gives_empty_context():
+    assert ContextBuilder(token_budget=1500, max_objects=10).build("the and what", CatalogStub(50)) == ""
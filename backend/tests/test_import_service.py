@@ -0,0 +1,35 @@
+from app.services.import_service import ImportService
+import asyncio
+import json
+import uuid
+
+
+def bundle(*lines):
+    async def body():
+        yield "".join(json.dumps({"table": table, "row": row}) + "\n" for table, row in lines).encode()
+    return body()
+
+
+def test_reference_checks_reject_rows(pg_session):
+    type_name = f"Valve {uuid.uuid4()}"
+    known, unknown_type, missing = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    result = asyncio.run(ImportService(lambda: pg_session).import_bundle(bundle(
+        ("object_types", {"id": 900000 + uuid.uuid4().int % 100000, "object_type": type_name, "parid": 0,
+                          "description": ""}),
+        ("objects", {"id": str(known), "name": "Gate valve", "description": "", "type": type_name}),
+        ("objects", {"id": str(unknown_type), "name": "Mystery", "description": "", "type": f"Nope {uuid.uuid4()}"}),
+        ("relations", {"id": str(uuid.uuid4()), "primary_object_id": str(unknown_type), "relation_type": "Feeds",
+                       "secondary_object_ids": []}),
+        ("relations", {"id": str(uuid.uuid4()), "primary_object_id": str(known), "relation_type": "Feeds",
+                       "secondary_object_ids": [str(missing)]}),
+        ("hierarchies", {"id": str(uuid.uuid4()), "parent_object_id": str(known), "child_object_ids": [str(known)]}),
+    )))
+
+    assert [(reject.line, reject.table, reject.reason) for reject in result.rejected] == [
+        (3, "objects", "unknown type"),
+        (4, "relations", "unknown primary_object_id"),
+        (5, "relations", "unknown id in secondary_object_ids"),
+    ]
+    assert result.rejected_count == 3
+    assert result.tables["objects"].inserted == 1
+    assert result.tables["hierarchies"].inserted == 1
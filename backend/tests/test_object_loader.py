@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+from app.services.object_loader import ObjectLoader
+import uuid
+
+
+class CountingSession:
+    """Answers ObjectLoader's IN query from a dict and records the ids of every query"""
+
+    def __init__(self, objects):
+        self.objects = {obj.id: obj for obj in objects}
+        self.queries = []
+
+    def query(self, entity):
+        return self
+
+    def filter(self, condition):
+        self._ids = list(condition.right.value)
+        return self
+
+    def all(self):
+        self.queries.append(self._ids)
+        return [self.objects[object_id] for object_id in self._ids if object_id in self.objects]
+
+
+def make_objects(count: int):
+    return [SimpleNamespace(id=uuid.UUID(int=n + 1), name=f"Object {n}") for n in range(count)]
+
+
+def test_get_many_fetches_uncached_ids_in_one_query():
+    objects = make_objects(5)
+    session = CountingSession(objects)
+    loader = ObjectLoader(session)
+    missing = uuid.UUID(int=99)
+
+    first = loader.get_many([objects[0].id, objects[1].id, objects[0].id])
+    second = loader.get_many([objects[1].id, objects[2].id, missing])
+
+    assert [obj.name for obj in first] == ["Object 0", "Object 1", "Object 0"]
+    assert [obj and obj.name for obj in second] == ["Object 1", "Object 2", None]
+    assert session.queries == [[objects[0].id, objects[1].id], [objects[2].id, missing]]
+
+
+def test_misses_are_cached_until_primed():
+    objects = make_objects(1)
+    session = CountingSession([])
+    loader = ObjectLoader(session)
+
+    assert loader.get(objects[0].id) is None
+    assert loader.get(objects[0].id) is None
+    loader.prime(objects[0])
+    assert loader.get(objects[0].id) is objects[0]
+    assert len(session.queries) == 1
+
+
+def test_forget_refetches():
+    objects = make_objects(1)
+    session = CountingSession(objects)
+    loader = ObjectLoader(session)
+
+    loader.get(objects[0].id)
+    loader.forget(objects[0].id)
+    loader.get(objects[0].id)
+
+    assert len(session.queries) == 2
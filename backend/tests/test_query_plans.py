@@ -0,0 +1,281 @@
+"""Plans of the DatabaseService read queries against a generated catalog.
+
+Every statement a call issues is captured and EXPLAINed: lookups and filters
+must be served by indexes, whole-table reads must scan each large table once.
+Runs only when DATABASE_URL points at Postgres; the catalog is rolled back.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from app.models.models import (
+    ObjectType, ObjectTable, ObjectTableRow, Relation, Hierarchy, HierarchyType, ChangeLog,
+    ChatSession, ChatMessage, User, relation_secondary_objects
+)
+from app.services.database import DatabaseService, OBJECT_EXPANSIONS
+from app.services.export_service import EXPORT_TABLES
+from app.services.import_service import ImportService
+from app.services.object_filter import parse_object_filter
+import asyncio
+import json
+import pytest
+import uuid
+
+
+ROWS = 20000
+
+# Tables that grow with the catalog or its use
+LARGE_TABLES = {
+    "objects", "object_tables", "object_table_rows", "relations", "relation_secondary_objects",
+    "hierarchies", "hierarchy_type", "change_log", "chat_sessions", "chat_messages", "users",
+}
+
+# Per-object lookups: no large table may be scanned
+LOOKUP_CHECKS = [
+    ("get_object", lambda db_service, c: db_service.get_object(c.object_id)),
+    ("get_objects_by_ids", lambda db_service, c: db_service.get_objects_by_ids([c.object_id])),
+    ("get_object_table_rows", lambda db_service, c: db_service.get_object_table_rows(
+        db_service.get_object_table(c.object_id, "Parts"), 0, 10)),
+    ("get_object_relations", lambda db_service, c: db_service.get_object_relations(c.object_id)),
+    ("get_relations_by_ids", lambda db_service, c: db_service.get_relations_by_ids([c.relation_id])),
+    ("get_relations_for_objects", lambda db_service, c: db_service.get_relations_for_objects([c.object_id])),
+    ("get_object_usage", lambda db_service, c: db_service.get_object_usage(c.object_id, 0, 100)),
+    ("get_object_hierarchy", lambda db_service, c: db_service.get_object_hierarchy(c.object_id)),
+    ("get_hierarchies_by_ids", lambda db_service, c: db_service.get_hierarchies_by_ids([c.hierarchy_id])),
+    ("get_hierarchies_for_objects", lambda db_service, c: db_service.get_hierarchies_for_objects([c.object_id])),
+    ("get_hierarchy_type_by_object", lambda db_service, c: db_service.get_hierarchy_type_by_object(c.number)),
+    ("get_changes", lambda db_service, c: db_service.get_changes((2 ** 62, 0), 100)),
+    ("get_catalog_versions", lambda db_service, c: db_service.get_catalog_versions()),
+    ("search_objects_by_terms", lambda db_service, c: db_service.search_objects_by_terms([c.name_prefix[-5:]], 20)),
+    ("rank_objects_fulltext", lambda db_service, c: db_service.rank_objects_fulltext([f"{c.number:06d}"], 20)),
+    ("expand_objects", lambda db_service, c: db_service.expand_objects(
+        db_service.get_objects(parse_object_filter(f'name^="{c.name_prefix}"')), list(OBJECT_EXPANSIONS))),
+    ("get_chat_session", lambda db_service, c: db_service.get_chat_session(c.chat_session_id)),
+    ("get_chat_messages", lambda db_service, c: db_service.get_chat_messages(c.chat_session_id, 10)),
+    ("get_user", lambda db_service, c: db_service.get_user(c.user_id)),
+    ("get_user_by_username", lambda db_service, c: db_service.get_user_by_username(c.username)),
+]
+
+# Filtered object queries and the index their plans must use
+FILTER_INDEX_CHECKS = [
+    ("type=PlanDocument", "ix_objects_type"),
+    ("attributes.status=S123", "ix_objects_attributes"),
+    ("attributes.owner=*", "ix_objects_attributes"),
+    ('name^="Part 00012"', "ix_objects_name_prefix"),
+    ("modified>=-7d", "ix_objects_modified_date"),
+]
+FILTER_CALLS = [
+    ("get_objects", lambda db_service, conditions: db_service.get_objects(conditions)),
+    ("get_object_facets", lambda db_service, conditions: db_service.get_object_facets(conditions, ["status"], 10)),
+]
+
+# Whole-table reads (list endpoints, reports, facets, export): each large table is read once
+FULL_READ_CHECKS = [
+    ("get_objects", lambda db_service: db_service.get_objects()),
+    ("get_object_types", lambda db_service: db_service.get_object_types()),
+    ("get_relation_types", lambda db_service: db_service.get_relation_types()),
+    ("get_relations", lambda db_service: db_service.get_relations()),
+    ("get_hierarchy_types", lambda db_service: db_service.get_hierarchy_types()),
+    ("get_hierarchies", lambda db_service: db_service.get_hierarchies()),
+    ("get_object_facets", lambda db_service: db_service.get_object_facets([], ["status", "owner"], 10)),
+    ("count_objects", lambda db_service: db_service.count_objects()),
+    ("iter_report_objects", lambda db_service: db_service.iter_report_objects()),
+    ("iter_object_summaries", lambda db_service: db_service.iter_object_summaries(with_description=True)),
+    ("iter_relation_rows", lambda db_service: db_service.iter_relation_rows()),
+    ("iter_hierarchy_rows", lambda db_service: db_service.iter_hierarchy_rows()),
+] + [
+    (f"iter_table_rows:{name}", lambda db_service, table=table: db_service.iter_table_rows(table))
+    for name, table in EXPORT_TABLES.items()
+] + [
+    (f"iter_table_json:{name}", lambda db_service, table=table: db_service.iter_table_json(table))
+    for name, table in EXPORT_TABLES.items()
+]
+
+
+def generate_catalog(connection, rows: int) -> SimpleNamespace:
+    """Objects each with a table, a relation, a hierarchy, a hierarchy type and a change pointing at
+    the next, plus users and chat sessions; returns ids and values of one sample row"""
+    now = datetime.now()
+    tag = uuid.uuid4().hex[:8]
+    object_ids = [uuid.uuid4() for _ in range(rows)]
+    pairs = list(zip(object_ids, object_ids[1:] + object_ids[:1]))
+    table_ids = [uuid.uuid4() for _ in range(rows)]
+    relation_ids = [uuid.uuid4() for _ in range(rows)]
+    hierarchy_ids = [uuid.uuid4() for _ in range(rows)]
+    chat_session_ids = [uuid.uuid4() for _ in range(rows)]
+    user_ids = [uuid.uuid4() for _ in range(rows)]
+
+    connection.execute(insert(ObjectType), [
+        {"id": object_id, "name": f"Part {n:06d}", "description": "", "revision": 1,
+         "type": "PlanDocument" if n % 1000 == 0 else "PlanItem",
+         "attributes": {"status": f"S{n % 500}", **({"owner": "plans"} if n % 1000 == 0 else {})},
+         "modified_date": now - timedelta(hours=10 * n)}
+        for n, object_id in enumerate(object_ids)
+    ])
+    connection.execute(insert(ObjectTable), [
+        {"id": table_id, "object_id": object_id, "name": "Parts", "position": 0, "columns": ["A", "B"], "row_count": 2}
+        for table_id, object_id in zip(table_ids, object_ids)
+    ])
+    connection.execute(insert(ObjectTableRow), [
+        {"table_id": table_id, "row_index": index, "cells": [index, "x"]} for table_id in table_ids for index in range(2)
+    ])
+    connection.execute(insert(Relation), [
+        {"id": relation_id, "primary_object_id": primary, "relation_type": f"Relation {n % 20}",
+         "secondary_object_ids": [str(secondary)]}
+        for n, (relation_id, (primary, secondary)) in enumerate(zip(relation_ids, pairs))
+    ])
+    connection.execute(insert(relation_secondary_objects), [
+        {"relation_id": relation_id, "object_id": secondary} for relation_id, (_, secondary) in zip(relation_ids, pairs)
+    ])
+    connection.execute(insert(Hierarchy), [
+        {"id": hierarchy_id, "parent_object_id": parent, "child_object_ids": [str(child)], "level": 0, "properties": {}}
+        for hierarchy_id, (parent, child) in zip(hierarchy_ids, pairs)
+    ])
+    connection.execute(insert(HierarchyType), [{"object_type": n} for n in range(rows)])
+    connection.execute(insert(ChangeLog), [
+        {"entity": "objects", "entity_id": object_id, "txid": n, "deleted": False}
+        for n, object_id in enumerate(object_ids)
+    ])
+    connection.execute(insert(ChatSession), [{"id": session_id, "message_count": 100} for session_id in chat_session_ids])
+    connection.execute(insert(ChatMessage), [
+        {"session_id": session_id, "seq": seq, "role": "user", "content": "Which parts are released?"}
+        for session_id in chat_session_ids[:rows // 100] for seq in range(1, 101)
+    ])
+    connection.execute(insert(User), [
+        {"id": user_id, "username": f"plan-{tag}-{n}", "password": ""} for n, user_id in enumerate(user_ids)
+    ])
+    # Statistics for rows this transaction can see, so the planner costs the real sizes, and GIN
+    # entries moved out of the pending lists as autovacuum would
+    for table in sorted(LARGE_TABLES):
+        connection.exec_driver_sql(f"ANALYZE {table}")
+    for index in ["ix_objects_attributes", "ix_objects_search_document", "ix_hierarchies_child_object_ids"]:
+        connection.exec_driver_sql(f"SELECT gin_clean_pending_list('{index}')")
+
+    sample = rows // 2 + 37
+    return SimpleNamespace(
+        number=sample, object_id=object_ids[sample], relation_id=relation_ids[sample],
+        hierarchy_id=hierarchy_ids[sample], name_prefix=f"Part {sample:06d}"[:10],
+        chat_session_id=chat_session_ids[rows // 200],
+        user_id=user_ids[sample], username=f"plan-{tag}-{sample}"
+    )
+
+
+@pytest.fixture(scope="module")
+def catalog(pg_connection):
+    return generate_catalog(pg_connection, ROWS)
+
+
+@pytest.fixture
+def db(pg_connection, catalog):
+    session = Session(bind=pg_connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def statement_plans(db, call) -> list:
+    """(statement, plan) for every statement the call issues that the planner plans"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+    plans = []
+    cursor = connection.connection.cursor()
+    try:
+        for statement, parameters in statements:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plans.append((statement, cursor.fetchone()[0][0]["Plan"]))
+    finally:
+        cursor.close()
+    assert plans, "the call issued no statements"
+    return plans
+
+
+def plan_nodes(node: dict, repeated: bool = False):
+    """(node, repeated) for the plan tree; repeated nodes can run once per row of an outer node"""
+    yield node, repeated
+    for child in node.get("Plans", []):
+        relationship = child.get("Parent Relationship")
+        child_repeated = repeated or (
+            (node["Node Type"] == "Nested Loop" and relationship == "Inner")
+            or (relationship == "SubPlan" and not child.get("Subplan Name", "").startswith("hashed"))
+        )
+        # A materialized or hashed input is read once however often it is rescanned
+        if node["Node Type"] in ("Materialize", "Hash"):
+            child_repeated = repeated
+        yield from plan_nodes(child, child_repeated)
+
+
+def large_scans(plan: dict) -> list:
+    return [
+        (node["Relation Name"], repeated) for node, repeated in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" and node["Relation Name"] in LARGE_TABLES
+    ]
+
+
+def index_names(plan: dict) -> set:
+    return {node["Index Name"] for node, _ in plan_nodes(plan) if "Index Name" in node}
+
+
+@pytest.mark.parametrize("name, lookup", LOOKUP_CHECKS, ids=[name for name, _ in LOOKUP_CHECKS])
+def test_lookups_use_indexes(db, catalog, name, lookup):
+    db_service = DatabaseService(db)
+    for statement, plan in statement_plans(db, lambda: lookup(db_service, catalog)):
+        assert not large_scans(plan), statement
+
+
+@pytest.mark.parametrize("call_name, call", FILTER_CALLS, ids=[name for name, _ in FILTER_CALLS])
+@pytest.mark.parametrize("expression, index_name", FILTER_INDEX_CHECKS, ids=[e for e, _ in FILTER_INDEX_CHECKS])
+def test_object_filters_use_their_index(db, expression, index_name, call_name, call):
+    db_service = DatabaseService(db)
+    plans = statement_plans(db, lambda: call(db_service, parse_object_filter(expression)))
+    object_plans = [plan for statement, plan in plans if "FROM objects" in statement]
+
+    assert object_plans and all(index_name in index_names(plan) for plan in object_plans)
+    for statement, plan in plans:
+        assert not large_scans(plan), statement
+
+
+@pytest.mark.parametrize("name, read", FULL_READ_CHECKS, ids=[name for name, _ in FULL_READ_CHECKS])
+def test_full_reads_scan_each_table_once(db, name, read):
+    db_service = DatabaseService(db)
+    for statement, plan in statement_plans(db, lambda: read(db_service)):
+        scans = large_scans(plan)
+        assert not [table for table, repeated in scans if repeated], statement
+        assert len(scans) == len({table for table, _ in scans}), statement
+
+
+def test_import_checks_use_indexes(db, catalog):
+    type_name = f"Plan valve {uuid.uuid4()}"
+    object_id, table_id = uuid.uuid4(), uuid.uuid4()
+    lines = [
+        ("object_types", {"id": 900000 + uuid.uuid4().int % 100000, "object_type": type_name, "parid": 0, "description": ""}),
+        ("objects", {"id": str(object_id), "name": "Plan valve", "description": "", "type": type_name}),
+        ("object_tables", {"id": str(table_id), "object_id": str(object_id), "name": "Parts", "columns": ["A"]}),
+        ("object_table_rows", {"table_id": str(table_id), "row_index": 0, "cells": [1]}),
+        ("relations", {"id": str(catalog.relation_id), "primary_object_id": str(catalog.object_id),
+                       "relation_type": "Feeds", "secondary_object_ids": [str(object_id)]}),
+        ("relation_secondary_objects", {"relation_id": str(catalog.relation_id), "object_id": str(object_id)}),
+        ("hierarchies", {"id": str(catalog.hierarchy_id), "parent_object_id": str(catalog.object_id),
+                         "child_object_ids": [str(object_id)]}),
+    ]
+
+    async def body():
+        yield "".join(json.dumps({"table": table, "row": row}) + "\n" for table, row in lines).encode()
+
+    results = []
+    plans = statement_plans(db, lambda: results.append(asyncio.run(ImportService(lambda: db).import_bundle(body()))))
+
+    assert results[0].rejected_count == 0
+    for statement, plan in plans:
+        assert not large_scans(plan), statement
@@ -0,0 +1,54 @@
+from app.services.report_cache import ReportCache
+import os
+import time
+
+
+def render(cache: ReportCache, content: bytes) -> str:
+    path = cache.temp_path()
+    with open(path, "wb") as output:
+        output.write(content)
+    return path
+
+
+def test_put_replaces_older_versions(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    old_path = cache.put("report-full", "v1", render(cache, b"v1"), 100.0)
+    new_path = cache.put("report-full", "v2", render(cache, b"v2"), 200.0)
+
+    assert not os.path.exists(old_path)
+    assert cache.get("report-full", "v2") == new_path
+
+
+def test_late_older_render_keeps_newer_version(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    new_path = cache.put("report-full", "v2", render(cache, b"v2"), 200.0)
+    # The job that read v1 finishes after the one that read v2
+    cache.put("report-full", "v1", render(cache, b"v1"), 100.0)
+
+    assert cache.get("report-full", "v2") == new_path
+    with open(new_path, "rb") as f:
+        assert f.read() == b"v2"
+
+
+def test_put_leaves_other_kinds(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    objects_path = cache.put("report-objects", "v1", render(cache, b"objects"), 100.0)
+    cache.put("report-full", "v2", render(cache, b"full"), 200.0)
+
+    assert os.path.exists(objects_path)
+
+
+def test_expire_removes_old_unserved_files(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    now = time.time()
+    stale_path = cache.put("report-objects", "v1", render(cache, b"stale"), now - 7200)
+    served_path = cache.put("report-relations", "v1", render(cache, b"served"), now - 7200)
+    fresh_path = cache.put("report-full", "v1", render(cache, b"fresh"), now)
+    section_path = cache.put("section-objects", "v1", render(cache, b"section"), now - 7200)
+
+    cache.expire("report-", 3600, {served_path})
+
+    assert not os.path.exists(stale_path)
+    assert os.path.exists(served_path)
+    assert os.path.exists(fresh_path)
+    assert os.path.exists(section_path)
@@ -0,0 +1,25 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.schemas import ObjectCreate, ObjectUpdate
+
+
+TABLES = [
+    {"name": "Parts", "columns": ["A"]},
+    {"name": "Parts", "columns": ["B"]},
+]
+
+
+@pytest.mark.parametrize("build", [
+    lambda tables: ObjectCreate(name="Pump", description="", type="Item", tables=tables),
+    lambda tables: ObjectUpdate(tables=tables),
+])
+def test_duplicate_table_names_are_rejected(build):
+    with pytest.raises(ValidationError, match="duplicate table names: Parts"):
+        build(TABLES)
+
+    assert [table.name for table in build(TABLES[:1]).tables] == ["Parts"]
+
+
+def test_update_without_tables_keeps_them():
+    assert ObjectUpdate(name="Pump").tables is None